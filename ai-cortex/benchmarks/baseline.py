@@ -0,0 +1,91 @@
+"""
+Benchmark Baselines — results are stored as flat metrics so runs from
+bench_micro.py and load_test.py can be saved to and checked against one file:
+    {"meta": {...}, "metrics": {"<name>": {"value": 1.2, "unit": "µs", "better": "lower"}}}
+"""
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Allowed relative slowdown before a metric counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def metric(value: float, unit: str, better: str) -> dict:
+    if better not in ("higher", "lower"):
+        raise ValueError(f"better must be 'higher' or 'lower', not {better!r}")
+    return {"value": round(float(value), 4), "unit": unit, "better": better}
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def load(path: str = BASELINE_PATH) -> dict:
+    if not os.path.isfile(path):
+        return {"meta": {}, "metrics": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(metrics: dict, path: str = BASELINE_PATH) -> dict:
+    """Merge `metrics` into the baseline file, replacing entries with the same name."""
+    baseline = load(path)
+    baseline["meta"] = machine()
+    baseline["metrics"] = dict(sorted({**baseline["metrics"], **metrics}.items()))
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return baseline
+
+
+def compare(metrics: dict, path: str = BASELINE_PATH, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """Print current vs baseline for shared metrics and return the names that regressed."""
+    baseline = load(path)["metrics"]
+    regressions = []
+    print(f"\n{'metric':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, current in metrics.items():
+        if name not in baseline:
+            continue
+        base, value = baseline[name]["value"], current["value"]
+        change = (value - base) / base if base else 0.0
+        worse = -change if current["better"] == "higher" else change
+        flag = ""
+        if worse > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {base:>12.3f} {value:>12.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def finish(metrics: dict, argv: list = None) -> int:
+    """
+    Shared CLI tail: --save [PATH] merges into the baseline, --check [PATH]
+    compares against it (with --tolerance X) and returns 1 on regression.
+    """
+    argv = sys.argv if argv is None else argv
+
+    def path_after(flag):
+        i = argv.index(flag)
+        return argv[i + 1] if i + 1 < len(argv) and not argv[i + 1].startswith("--") else BASELINE_PATH
+
+    if "--save" in argv:
+        path = path_after("--save")
+        save(metrics, path)
+        print(f"\nSaved {len(metrics)} metrics to {path}")
+    if "--check" in argv:
+        tolerance = float(argv[argv.index("--tolerance") + 1]) if "--tolerance" in argv else DEFAULT_TOLERANCE
+        regressions = compare(metrics, path_after("--check"), tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\n✅ No regressions beyond {tolerance:.0%}")
+    return 0
@@ -0,0 +1,70 @@
+"""
+Inference Benchmark — per-row cost of predict_risk (one call per location)
+versus predict_risk_batch (one model call per batch). Parity with the old
+per-row prediction is covered by tests/test_model.py.
+Run: python benchmarks/bench_inference.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ml.model import load_model, predict_risk, predict_risk_batch  # noqa: E402
+
+SIZES = [1, 100, 10_000]
+MIN_SECONDS = 1.0
+
+
+def make_records(n: int, seed: int = 42) -> tuple:
+    """Random but plausible weather/discharge records."""
+    rng = np.random.default_rng(seed)
+    weathers = [
+        {
+            "rainfall_24h": float(rng.exponential(30)),
+            "rainfall_7d": float(rng.exponential(150)),
+            "soil_moisture": float(rng.uniform(0.1, 0.95)),
+            "humidity": float(rng.uniform(30, 98)),
+            "temperature": float(rng.uniform(15, 42)),
+            "wind_speed": float(rng.uniform(0, 40)),
+            "weather_code": int(rng.choice([0, 3, 61, 63, 65, 80, 95])),
+        }
+        for _ in range(n)
+    ]
+    discharges = [
+        {
+            "current_discharge": float(d),
+            "max_discharge_7d": float(d * 1.5),
+            "avg_discharge_7d": float(d * 0.8),
+        }
+        for d in rng.exponential(300, n)
+    ]
+    return weathers, discharges
+
+
+def time_per_row(fn, n: int) -> float:
+    """Repeat `fn` for at least MIN_SECONDS and return microseconds per row."""
+    fn()  # warm-up
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return elapsed / (runs * n) * 1e6
+
+
+def main():
+    print(f"Model: {load_model()['status']}")
+    print(f"{'N':>8} {'scalar µs/row':>15} {'batch µs/row':>14} {'speedup':>9}")
+    for n in SIZES:
+        weathers, discharges = make_records(n)
+        scalar = time_per_row(lambda: [predict_risk(w, d) for w, d in zip(weathers, discharges)], n)
+        batch = time_per_row(lambda: predict_risk_batch(weathers, discharges), n)
+        print(f"{n:>8} {scalar:>15.1f} {batch:>14.1f} {scalar / batch:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmarks — per-call cost of the hot functions behind /predict:
+upstream response decoding and parsing into snapshots, rendering a snapshot as a record,
+compute_features, predict_risk, the forecast-hour horizon, interpret_weather_risk
+and rendering the response.
+Run: python benchmarks/bench_micro.py [--save [PATH]] [--check [PATH]] [--tolerance 0.25]
+"""
+import os
+import sys
+from datetime import datetime
+
+import orjson
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ml.model import compute_features, load_model, predict_risk, predict_risk_horizon  # noqa: E402
+from services.alert_service import interpret_weather_risk, interpret_weather_risk_batch  # noqa: E402
+from services.responses import FastJSONResponse, shape  # noqa: E402
+from services.snapshots import horizon_features  # noqa: E402
+from services.weather_service import _parse_discharge, _parse_weather  # noqa: E402
+from bench_inference import time_per_row  # noqa: E402
+from openmeteo_standin import synthetic_flood, synthetic_forecast  # noqa: E402
+import baseline  # noqa: E402
+
+LAT, LON = 26.14, 91.67
+
+
+def make_inputs() -> dict:
+    """Realistic upstream payloads plus parsed records: a wet location with several alerts and a calm one."""
+    day = datetime.now().strftime("%Y-%m-%d")
+    forecast = synthetic_forecast(LAT, LON, 42, day, hour=9)
+    flood = synthetic_flood(LAT, LON, 42, day)
+    snapshot = _parse_weather(forecast)
+    weather = snapshot.as_dict(LAT, LON)
+    stormy = {**weather, "rainfall_24h": 120.4, "rainfall_7d": 350.2, "soil_moisture": 0.86, "weather_code": 95}
+    calm = {**weather, "rainfall_24h": 0.0, "rainfall_7d": 2.1, "soil_moisture": 0.2, "weather_code": 1}
+    return {
+        "forecast": forecast,
+        "flood": flood,
+        "weather": stormy,
+        "calm": calm,
+        "snapshot": snapshot,
+        "discharge_snapshot": _parse_discharge(flood),
+        "discharge": _parse_discharge(flood).as_dict(LAT, LON),
+    }
+
+
+def run() -> dict:
+    inputs = make_inputs()
+    weather, discharge = inputs["weather"], inputs["discharge"]
+    raw_forecast = orjson.dumps(inputs["forecast"])
+    body = {
+        "status": "success",
+        "location": {"lat": LAT, "lon": LON, "district": None, "state": None},
+        "risk": predict_risk(weather, discharge),
+        "weather": weather,
+        "discharge": discharge,
+        "alerts": interpret_weather_risk(weather),
+    }
+    cases = {
+        "decode_forecast": lambda: orjson.loads(raw_forecast),
+        "parse_weather": lambda: _parse_weather(inputs["forecast"]),
+        "parse_discharge": lambda: _parse_discharge(inputs["flood"]),
+        "weather_as_dict": lambda: inputs["snapshot"].as_dict(LAT, LON),
+        "compute_features": lambda: compute_features(weather, discharge),
+        "predict_risk": lambda: predict_risk(weather, discharge),
+        "predict_horizon": lambda: predict_risk_horizon(
+            horizon_features(inputs["snapshot"], inputs["discharge_snapshot"])[1]),
+        "interpret_weather_risk.alerts": lambda: interpret_weather_risk(weather),
+        "interpret_weather_risk.all_clear": lambda: interpret_weather_risk(inputs["calm"]),
+        "interpret_weather_risk_batch.100": lambda: interpret_weather_risk_batch([weather, inputs["calm"]] * 50),
+        "render_predict": lambda: FastJSONResponse(body),
+        "render_predict.compact": lambda: FastJSONResponse(shape(body, None, True)),
+    }
+    metrics = {}
+    print(f"{'function':<36} {'µs/call':>10}")
+    for name, fn in cases.items():
+        us = time_per_row(fn, 1)
+        metrics[f"micro.{name}.us"] = baseline.metric(us, "µs", "lower")
+        print(f"{name:<36} {us:>10.2f}")
+    return metrics
+
+
+def main() -> int:
+    print(f"Model: {load_model()['status']}")
+    return baseline.finish(run())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Rule Engine Benchmark — parity and per-row cost of the vectorized rule-based
+fallback and contributing-factor engines against their scalar references.
+Run: python benchmarks/bench_rules.py
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ml.model import (  # noqa: E402
+    FACTOR_RULES, RISK_RULES,
+    _contributing_factors_batch, _get_contributing_factors,
+    _rule_based_risk, _rule_based_risk_batch,
+)
+from bench_inference import time_per_row  # noqa: E402
+
+SIZES = [1, 100, 10_000]
+
+
+def make_features(n: int, seed: int = 7) -> np.ndarray:
+    """Random feature rows, with a share of values sitting exactly on rule thresholds."""
+    rng = np.random.default_rng(seed)
+    features = np.column_stack([
+        rng.exponential(60, n),          # rainfall_24h
+        rng.exponential(250, n),         # rainfall_7d
+        rng.uniform(0, 1, n),            # soil_moisture
+        rng.exponential(1500, n),        # river_discharge
+        rng.exponential(2000, n),        # max_discharge_7d
+        rng.exponential(1000, n),        # avg_discharge_7d
+        rng.uniform(30, 98, n),          # humidity
+        rng.uniform(15, 42, n),          # temperature
+        rng.uniform(0, 40, n),           # wind_speed
+        rng.choice([0, 3, 61, 63, 65, 95], n).astype(float),
+    ])
+    edges = {}
+    for index, thresholds, _ in RISK_RULES:
+        edges.setdefault(index, set()).update(thresholds)
+    for index, threshold, *_ in FACTOR_RULES:
+        edges.setdefault(index, set()).add(threshold)
+    for index, values in edges.items():
+        on_edge = rng.random(n) < 0.2
+        features[on_edge, index] = rng.choice(sorted(values), on_edge.sum())
+    return features
+
+
+def check_parity(features: np.ndarray):
+    expected_risk = np.array([_rule_based_risk(row) for row in features])
+    assert np.array_equal(_rule_based_risk_batch(features), expected_risk), "rule-based risk differs"
+    expected_factors = [_get_contributing_factors(row) for row in features]
+    assert _contributing_factors_batch(features) == expected_factors, "contributing factors differ"
+
+
+def main():
+    check_parity(make_features(100_000))
+    print("Parity OK on 100,000 rows (including threshold edges)\n")
+
+    print(f"{'N':>8} {'engine':>8} {'scalar µs/row':>15} {'batch µs/row':>14} {'speedup':>9}")
+    for n in SIZES:
+        features = make_features(n)
+        for name, scalar_fn, batch_fn in [
+            ("risk", _rule_based_risk, _rule_based_risk_batch),
+            ("factors", _get_contributing_factors, _contributing_factors_batch),
+        ]:
+            scalar = time_per_row(lambda: [scalar_fn(row) for row in features], n)
+            batch = time_per_row(lambda: batch_fn(features), n)
+            print(f"{n:>8} {name:>8} {scalar:>15.2f} {batch:>14.2f} {scalar / batch:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Load Test — starts the Open-Meteo stand-in and the ai-cortex API as subprocesses,
+then drives /predict, /predict/bulk, /weather and /alerts at increasing concurrency.
+Reports throughput, p50/p95/p99 latency, event-loop lag (from /stats/runtime)
+and server RSS for each stage.
+Run: python benchmarks/load_test.py [--duration 5] [--concurrency 1,8,32,64]
+         [--endpoints predict,bulk,weather,alerts] [--latency-ms 40] [--points 0]
+         [--save [PATH]] [--check [PATH]] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import baseline  # noqa: E402
+
+CORTEX_DIR = os.path.join(os.path.dirname(__file__), "..")
+STANDIN_PORT = 8091
+API_PORT = 8001
+# Rough bounding box of India; random points land in different upstream grid cells
+LAT_RANGE, LON_RANGE = (8.0, 32.0), (70.0, 92.0)
+BULK_SIZE = 50
+STATS_INTERVAL = 0.25
+
+
+def read_rss_mb(pid: int):
+    """Resident set size of `pid` in MB (Linux only; None elsewhere)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class PointSource:
+    """
+    Random points, or a fixed pool of `size` points to model a warm cache.
+    The pool is the same for every endpoint; random sequences differ by seed.
+    """
+
+    def __init__(self, size: int, seed: int = 42):
+        pool_rng = random.Random(42)
+        self.pool = [(round(pool_rng.uniform(*LAT_RANGE), 4), round(pool_rng.uniform(*LON_RANGE), 4))
+                     for _ in range(size)]
+        self.rng = random.Random(seed)
+
+    def _random(self) -> tuple:
+        return round(self.rng.uniform(*LAT_RANGE), 4), round(self.rng.uniform(*LON_RANGE), 4)
+
+    def next(self) -> tuple:
+        return self.rng.choice(self.pool) if self.pool else self._random()
+
+
+def make_request(endpoint: str, points: PointSource) -> tuple:
+    """(method, path, json body or query params) for one request."""
+    lat, lon = points.next()
+    if endpoint == "predict":
+        return "POST", "/predict", {"json": {"lat": lat, "lon": lon}}
+    if endpoint == "bulk":
+        locations = [dict(zip(("lat", "lon"), points.next())) for _ in range(BULK_SIZE)]
+        return "POST", "/predict/bulk", {"json": {"locations": locations}}
+    if endpoint in ("weather", "alerts"):
+        return "GET", f"/{endpoint}", {"params": {"lat": lat, "lon": lon}}
+    raise ValueError(f"Unknown endpoint {endpoint!r}")
+
+
+async def run_stage(client: httpx.AsyncClient, endpoint: str, concurrency: int, duration: float,
+                    points: PointSource, api_pid: int) -> dict:
+    latencies, errors = [], 0
+    lag_samples, rss_samples = [], []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            method, path, kwargs = make_request(endpoint, points)
+            started = time.perf_counter()
+            try:
+                resp = await client.request(method, path, **kwargs)
+                if resp.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async def sample_server():
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(STATS_INTERVAL)
+            try:
+                runtime = (await client.get("/stats/runtime")).json()["data"]
+                lag_samples.append(runtime["event_loop_lag"]["last_ms"])
+            except (httpx.HTTPError, KeyError, ValueError):
+                pass
+            rss = read_rss_mb(api_pid)
+            if rss is not None:
+                rss_samples.append(rss)
+
+    started = time.perf_counter()
+    await asyncio.gather(sample_server(), *(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.asarray(latencies)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "loop_lag_max_ms": max(lag_samples, default=0.0),
+        "rss_mb": max(rss_samples, default=0.0),
+    }
+
+
+def stage_metrics(endpoint: str, concurrency: int, result: dict) -> dict:
+    prefix = f"load.{endpoint}.c{concurrency}"
+    return {
+        f"{prefix}.throughput": baseline.metric(result["throughput"], "req/s", "higher"),
+        f"{prefix}.p50_ms": baseline.metric(result["p50_ms"], "ms", "lower"),
+        f"{prefix}.p95_ms": baseline.metric(result["p95_ms"], "ms", "lower"),
+        f"{prefix}.p99_ms": baseline.metric(result["p99_ms"], "ms", "lower"),
+        f"{prefix}.loop_lag_max_ms": baseline.metric(result["loop_lag_max_ms"], "ms", "lower"),
+    }
+
+
+def start_process(args: list, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(args, cwd=CORTEX_DIR, env={**os.environ, **env},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_until_ready(url: str, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"{url} not ready after {timeout:g}s")
+
+
+async def run(args) -> dict:
+    standin = start_process(
+        [sys.executable, "benchmarks/openmeteo_standin.py", "--port", str(STANDIN_PORT),
+         "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.latency_ms / 2)],
+        {},
+    )
+    upstream = f"http://127.0.0.1:{STANDIN_PORT}/v1"
+    # A fresh disk cache per run: PointSource is seeded, so a shared one would make every run after the first warm
+    cache_dir = tempfile.TemporaryDirectory(prefix="floodsense-load-")
+    api = start_process(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(API_PORT), "--log-level", "warning"],
+        {"OPEN_METEO_BASE": upstream, "FLOOD_API_BASE": upstream,
+         "SNAPSHOT_ENABLED": "false", "MODEL_WATCH_INTERVAL": "0",
+         "DISK_CACHE_PATH": os.path.join(cache_dir.name, "openmeteo.sqlite3")},
+    )
+    try:
+        await wait_until_ready(f"http://127.0.0.1:{STANDIN_PORT}/stats")
+        await wait_until_ready(f"http://127.0.0.1:{API_PORT}/health/ready")
+        print(f"API ready (pid {api.pid}, RSS {read_rss_mb(api.pid) or 0:.0f} MB); "
+              f"stand-in latency {args.latency_ms:g}±{args.latency_ms / 2:g}ms\n")
+
+        limits = httpx.Limits(max_connections=max(args.concurrency) + 1, max_keepalive_connections=max(args.concurrency) + 1)
+        metrics = {}
+        print(f"{'endpoint':<9} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'errors':>7} {'lag ms':>7} {'RSS MB':>7}")
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{API_PORT}", limits=limits, timeout=60) as client:
+            for seed, endpoint in enumerate(args.endpoints):
+                points = PointSource(args.points, seed)
+                for concurrency in args.concurrency:
+                    r = await run_stage(client, endpoint, concurrency, args.duration, points, api.pid)
+                    metrics.update(stage_metrics(endpoint, concurrency, r))
+                    print(f"{endpoint:<9} {concurrency:>5} {r['throughput']:>9.1f} {r['p50_ms']:>8.1f} "
+                          f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>7} "
+                          f"{r['loop_lag_max_ms']:>7.1f} {r['rss_mb']:>7.0f}")
+        metrics["load.rss_mb"] = baseline.metric(read_rss_mb(api.pid) or 0.0, "MB", "lower")
+        return metrics
+    finally:
+        for proc in (api, standin):
+            proc.terminate()
+            proc.wait(timeout=10)
+        cache_dir.cleanup()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ai-cortex load test against a local Open-Meteo stand-in")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per stage")
+    parser.add_argument("--concurrency", default="1,8,32,64")
+    parser.add_argument("--endpoints", default="predict,bulk,weather,alerts")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="stand-in upstream latency")
+    parser.add_argument("--points", type=int, default=0, help="fixed point pool size (0 = random points)")
+    # --save/--check/--tolerance are handled by baseline.finish
+    args, _ = parser.parse_known_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    args.endpoints = args.endpoints.split(",")
+    return args
+
+
+def main() -> int:
+    return baseline.finish(asyncio.run(run(parse_args())))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+"""
+Open-Meteo Stand-in — a local server for /v1/forecast and /v1/flood so ai-cortex
+can be load-tested without network access or hammering the real API.
+
+Modes:
+    synthetic  realistic responses generated deterministically from (lat, lon, seed)
+    record     proxy to the real Open-Meteo APIs and save each location's full 7+3-day response
+    replay     serve saved responses only (unknown locations get a 404), frozen at the recording time
+
+Point ai-cortex at it:
+    OPEN_METEO_BASE=http://127.0.0.1:8090/v1 FLOOD_API_BASE=http://127.0.0.1:8090/v1 uvicorn main:app
+
+Run: python benchmarks/openmeteo_standin.py [--mode synthetic|record|replay] [--port 8090]
+         [--latency-ms 40] [--jitter-ms 20] [--error-rate 0.01] [--fixtures DIR] [--seed 42]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import numpy as np
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.http_client import get_json  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+UPSTREAMS = {
+    "forecast": "https://api.open-meteo.com/v1/forecast",
+    "flood": "https://flood-api.open-meteo.com/v1/flood",
+}
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "openmeteo")
+PAST_DAYS, FORECAST_DAYS = 7, 3        # the window ai-cortex asks for on a full fetch
+SERIES_PAST_DAYS, SERIES_FORECAST_DAYS = 14, 16  # the most any request can get
+
+
+class StandinConfig:
+    __slots__ = ("mode", "latency_ms", "jitter_ms", "error_rate", "fixtures", "seed")
+
+    def __init__(self, mode: str = "synthetic", latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, fixtures: str = DEFAULT_FIXTURES, seed: int = 42):
+        if mode not in ("synthetic", "record", "replay"):
+            raise ValueError(f"Unknown mode {mode!r}")
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.fixtures = fixtures
+        self.seed = seed
+
+
+# ─── Synthetic responses ─────────────────────────────
+
+def _location_rng(endpoint: str, lat: float, lon: float, seed: int) -> np.random.Generator:
+    digest = hashlib.sha1(f"{endpoint}:{lat:.4f}:{lon:.4f}:{seed}".encode()).digest()
+    return np.random.default_rng(int.from_bytes(digest[:8], "little"))
+
+
+def _hour_times(start: datetime, hours: int) -> list:
+    return [(start + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(hours)]
+
+
+def _day_times(start: datetime, days: int) -> list:
+    return [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(days)]
+
+
+@lru_cache(maxsize=100_000)
+def _forecast_series(lat: float, lon: float, seed: int, day: str) -> dict:
+    """Every hour from SERIES_PAST_DAYS before `day` to SERIES_FORECAST_DAYS after, so any window is a slice."""
+    rng = _location_rng("forecast", lat, lon, seed)
+    start = datetime.strptime(day, "%Y-%m-%d") - timedelta(days=SERIES_PAST_DAYS)
+    hours = (SERIES_PAST_DAYS + SERIES_FORECAST_DAYS) * 24
+
+    wetness = rng.beta(1.2, 2.5)                       # how rainy this location is
+    raining = rng.random(hours) < wetness * 0.5
+    precipitation = np.round(np.where(raining, rng.exponential(1 + 6 * wetness, hours), 0.0), 1)
+    soil = np.clip(0.12 + 0.35 * wetness + np.convolve(precipitation, np.ones(24) / 400, "same"), 0.05, 0.6)
+    temperature = np.round(26 + 6 * np.sin(np.arange(hours) * 2 * np.pi / 24) + rng.normal(0, 1, hours), 1)
+    return {
+        "start": start,
+        "precipitation": precipitation,
+        "soil": np.round(soil, 3),
+        "temperature": temperature,
+        "daily_rain": np.round(precipitation.reshape(-1, 24).sum(axis=1), 1),
+        "humidity": int(np.clip(55 + 40 * wetness + rng.normal(0, 5), 20, 100)),
+        "wind_speed": round(float(rng.gamma(2.0, 5.0)), 1),
+    }
+
+
+def synthetic_forecast(lat: float, lon: float, seed: int, day: str, hour: int = 0, past_days: int = PAST_DAYS,
+                       forecast_days: int = FORECAST_DAYS, past_hours: int = None, forecast_hours: int = None,
+                       utc_offset: int = 19800) -> dict:
+    """
+    Hourly rain with wet and dry spells, soil moisture that follows it, and a matching current block.
+    Windows follow Open-Meteo: past_days/forecast_days from local midnight, past_hours/forecast_hours
+    (hourly only) from the current `hour`.
+    """
+    series = _forecast_series(lat, lon, seed, day)
+    midnight = SERIES_PAST_DAYS * 24
+    now = midnight + hour
+    if past_hours is None and forecast_hours is None:
+        first, last = midnight - past_days * 24, midnight + forecast_days * 24
+    else:
+        first = now - (past_hours or 0)
+        last = now + forecast_hours if forecast_hours is not None else midnight + forecast_days * 24
+    hourly = slice(first, last)
+    daily = slice(SERIES_PAST_DAYS - past_days, SERIES_PAST_DAYS + forecast_days)
+
+    current_rain = float(series["precipitation"][now])
+    weather_code = (
+        0 if current_rain == 0 else
+        61 if current_rain < 2.5 else
+        63 if current_rain < 7.6 else
+        65 if current_rain < 20 else 95
+    )
+    start = series["start"]
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "utc_offset_seconds": utc_offset,
+        "timezone": "Asia/Kolkata" if utc_offset else "GMT",
+        "current": {
+            "time": (start + timedelta(hours=now)).strftime("%Y-%m-%dT%H:%M"),
+            "temperature_2m": float(series["temperature"][now]),
+            "relative_humidity_2m": series["humidity"],
+            "precipitation": current_rain,
+            "rain": current_rain,
+            "weather_code": weather_code,
+            "wind_speed_10m": series["wind_speed"],
+        },
+        "hourly": {
+            "time": _hour_times(start + timedelta(hours=first), last - first),
+            "precipitation": series["precipitation"][hourly].tolist(),
+            "soil_moisture_0_to_1cm": series["soil"][hourly].tolist(),
+            "temperature_2m": series["temperature"][hourly].tolist(),
+        },
+        "daily": {
+            "time": _day_times(start + timedelta(days=daily.start), daily.stop - daily.start),
+            "precipitation_sum": series["daily_rain"][daily].tolist(),
+            "rain_sum": series["daily_rain"][daily].tolist(),
+        },
+    }
+
+
+@lru_cache(maxsize=100_000)
+def _flood_series(lat: float, lon: float, seed: int, day: str) -> np.ndarray:
+    rng = _location_rng("flood", lat, lon, seed)
+    base = rng.lognormal(4.5, 1.2)
+    days = SERIES_PAST_DAYS + SERIES_FORECAST_DAYS
+    return np.round(base * np.exp(np.cumsum(rng.normal(0, 0.15, days))), 2)
+
+
+def synthetic_flood(lat: float, lon: float, seed: int, day: str, past_days: int = PAST_DAYS,
+                    forecast_days: int = FORECAST_DAYS) -> dict:
+    """Daily river discharge as a random walk around a per-location base flow."""
+    discharge = _flood_series(lat, lon, seed, day)
+    start = datetime.strptime(day, "%Y-%m-%d") - timedelta(days=past_days)
+    window = slice(SERIES_PAST_DAYS - past_days, SERIES_PAST_DAYS + forecast_days)
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "utc_offset_seconds": 0,
+        "daily": {"time": _day_times(start, past_days + forecast_days), "river_discharge": discharge[window].tolist()},
+    }
+
+
+def _synthetic_item(endpoint: str, lat: float, lon: float, seed: int, params: dict) -> dict:
+    """Build one location's response for the window asked for, anchored at the real current time."""
+    def opt(name):
+        return int(params[name]) if name in params else None
+
+    past_days = min(opt("past_days") or 0, SERIES_PAST_DAYS)
+    utc_offset = 0 if params.get("timezone", "GMT") in ("GMT", "UTC") else 19800
+    now = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=utc_offset)
+    day = now.strftime("%Y-%m-%d")
+    if endpoint == "flood":
+        forecast_days = min(opt("forecast_days") or 92, SERIES_FORECAST_DAYS)
+        return synthetic_flood(lat, lon, seed, day, past_days, forecast_days)
+    forecast_days = min(opt("forecast_days") or 7, SERIES_FORECAST_DAYS)
+    past_hours, forecast_hours = opt("past_hours"), opt("forecast_hours")
+    if past_hours is not None:
+        past_hours = min(past_hours, SERIES_PAST_DAYS * 24)
+    if forecast_hours is not None:
+        forecast_hours = min(forecast_hours, SERIES_FORECAST_DAYS * 24 - now.hour)
+    return synthetic_forecast(lat, lon, seed, day, now.hour, past_days, forecast_days,
+                              past_hours, forecast_hours, utc_offset)
+
+
+# ─── Record / replay fixtures ────────────────────────
+
+# Fixtures always hold the full window ai-cortex asks for on a full fetch; every narrower
+# (incremental) window it requests is a slice of it, taken around the recorded current hour/day
+WINDOW_PARAMS = ("past_days", "forecast_days", "past_hours", "forecast_hours")
+RECORD_WINDOW = {"past_days": PAST_DAYS, "forecast_days": FORECAST_DAYS}
+
+
+def fixture_path(fixtures: str, endpoint: str, lat: float, lon: float) -> str:
+    return os.path.join(fixtures, endpoint, f"{lat:.4f}_{lon:.4f}.json")
+
+
+def _slice_block(block: dict, start: int, stop: int) -> dict:
+    start, stop = max(0, start), max(0, stop)
+    return {name: values[start:stop] if isinstance(values, list) else values for name, values in block.items()}
+
+
+def window_slice(endpoint: str, item: dict, params: dict) -> dict:
+    """
+    The part of a full-window fixture that a request's window covers, with Open-Meteo's semantics
+    (see synthetic_forecast). "Now" is when it was recorded: the current hour, or the flood API's today.
+    """
+    def opt(name):
+        return int(params[name]) if name in params else None
+
+    past_days, forecast_days = opt("past_days") or 0, opt("forecast_days")
+    daily = item.get("daily", {})
+    if endpoint == "flood":
+        today = RECORD_WINDOW["past_days"]
+        last_day = today + forecast_days if forecast_days is not None else len(daily.get("time", []))
+        return {**item, "daily": _slice_block(daily, today - past_days, last_day)}
+
+    current_time = item["current"]["time"]  # "2026-10-17T05:15", local
+    today = daily["time"].index(current_time[:10])
+    forecast_days = forecast_days if forecast_days is not None else RECORD_WINDOW["forecast_days"]
+    midnight = item["hourly"]["time"].index(f"{current_time[:10]}T00:00")
+    now = midnight + int(current_time[11:13])
+    past_hours, forecast_hours = opt("past_hours"), opt("forecast_hours")
+    if past_hours is None and forecast_hours is None:
+        first, last = midnight - past_days * 24, midnight + forecast_days * 24
+    else:
+        first = now - (past_hours or 0)
+        last = now + forecast_hours if forecast_hours is not None else midnight + forecast_days * 24
+    return {
+        **item,
+        "hourly": _slice_block(item["hourly"], first, last),
+        "daily": _slice_block(daily, today - past_days, today + forecast_days),
+    }
+
+
+def load_fixture(fixtures: str, endpoint: str, lat: float, lon: float):
+    path = fixture_path(fixtures, endpoint, lat, lon)
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_fixture(fixtures: str, endpoint: str, lat: float, lon: float, item: dict):
+    path = fixture_path(fixtures, endpoint, lat, lon)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(item, f)
+    os.replace(tmp, path)
+
+
+async def record(endpoint: str, params: dict, points: list, fixtures: str) -> list:
+    """
+    Fetch the full window from the real API in one multi-location call, save each location
+    separately and answer with the window that was asked for.
+    """
+    upstream = {**{k: v for k, v in params.items() if k not in WINDOW_PARAMS}, **RECORD_WINDOW}
+    data = await get_json(UPSTREAMS[endpoint], upstream)
+    items = data if isinstance(data, list) else [data]
+    for (lat, lon), item in zip(points, items):
+        save_fixture(fixtures, endpoint, lat, lon, item)
+    return [window_slice(endpoint, item, params) for item in items]
+
+
+# ─── App ─────────────────────────────────────────────
+
+def create_app(config: StandinConfig) -> FastAPI:
+    app = FastAPI(title="Open-Meteo stand-in")
+    chaos = random.Random(config.seed)
+    stats = {"requests": 0, "locations": 0, "errors_injected": 0, "replay_misses": 0}
+
+    async def serve(endpoint: str, request: Request):
+        stats["requests"] += 1
+        params = dict(request.query_params)
+        try:
+            lats = [float(v) for v in params["latitude"].split(",")]
+            lons = [float(v) for v in params["longitude"].split(",")]
+        except (KeyError, ValueError):
+            return JSONResponse({"error": True, "reason": "latitude and longitude are required"}, status_code=400)
+        if len(lats) != len(lons):
+            return JSONResponse({"error": True, "reason": "Parameter count of latitude and longitude must be the same"},
+                                status_code=400)
+        points = list(zip(lats, lons))
+        stats["locations"] += len(points)
+
+        if config.latency_ms or config.jitter_ms:
+            await asyncio.sleep(max(0.0, config.latency_ms + chaos.uniform(-1, 1) * config.jitter_ms) / 1000)
+        if config.error_rate and chaos.random() < config.error_rate:
+            stats["errors_injected"] += 1
+            return JSONResponse({"error": True, "reason": "Injected upstream error"}, status_code=503)
+
+        if config.mode == "record":
+            items = await record(endpoint, params, points, config.fixtures)
+        elif config.mode == "replay":
+            items = [load_fixture(config.fixtures, endpoint, lat, lon) for lat, lon in points]
+            missing = [p for p, item in zip(points, items) if item is None]
+            if missing:
+                stats["replay_misses"] += len(missing)
+                return JSONResponse({"error": True, "reason": f"No recorded response for {missing[:5]}"},
+                                    status_code=404)
+            items = [window_slice(endpoint, item, params) for item in items]
+        else:
+            items = [_synthetic_item(endpoint, lat, lon, config.seed, params) for lat, lon in points]
+
+        body = orjson.dumps(items if len(items) > 1 else items[0])
+        return Response(content=body, media_type="application/json")
+
+    @app.get("/v1/forecast")
+    async def forecast(request: Request):
+        return await serve("forecast", request)
+
+    @app.get("/v1/flood")
+    async def flood(request: Request):
+        return await serve("flood", request)
+
+    @app.get("/stats")
+    def standin_stats():
+        return {"mode": config.mode, **stats}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Open-Meteo stand-in for offline load tests")
+    parser.add_argument("--mode", choices=["synthetic", "record", "replay"], default="synthetic")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added delay per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform ± jitter on the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="record/replay directory")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = StandinConfig(args.mode, args.latency_ms, args.jitter_ms, args.error_rate, args.fixtures, args.seed)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
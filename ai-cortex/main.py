@@ -2,23 +2,108 @@
 FloodSense AI Cortex — Real-time flood risk prediction API.
 Integrates Open-Meteo weather data with ML-based risk prediction.
 """
-from fastapi import FastAPI, HTTPException, Query
+import time
+
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
+from contextlib import asynccontextmanager
+import asyncio
+import hmac
 import logging
-
-from services.weather_service import get_current_weather, get_river_discharge
-from services.alert_service import interpret_weather_risk
-from ml.model import predict_risk
+import os
+
+from services.http_client import close_clients, pool_stats
+from services import metrics, push, risk_snapshot
+from services.responses import FastJSONResponse, parse_fields, shape
+from services.snapshots import feature_matrix, horizon_features
+from services.tracing import TimingMiddleware, span, timed
+from services.loop_monitor import run_lag_monitor, lag_stats
+from services.weather_service import (
+    get_current_weather, get_river_discharge, get_location_data, get_weather_snapshot, get_discharge_snapshot,
+    cache_stats, batch_stats, close_disk_cache,
+)
+from services.alert_service import interpret_weather_risk, interpret_weather_risk_batch
+from ml.model import predict_risk, predict_risk_features, predict_risk_horizon, load_model, model_state, active_version
+from ml import executor, registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Startup timings, reported by /health/ready to track cold-start regressions.
+# For a per-module breakdown run: python -X importtime -c "import main"
+STARTUP_PROFILE = {"imports_ms": round((time.perf_counter() - _import_started) * 1000, 1)}
+
+# Max locations per /predict/bulk call, and per-location budget so one slow cell can't stall the batch
+BULK_MAX_LOCATIONS = int(os.getenv("BULK_MAX_LOCATIONS", "2000"))
+LOCATION_TIMEOUT = float(os.getenv("LOCATION_TIMEOUT", "20.0"))
+
+# How often to check the model registry for a new current version (0 disables the watcher)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "30"))
+# Required in X-Admin-Token for /admin endpoints; they are disabled when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info(f"Imports took {STARTUP_PROFILE['imports_ms']}ms")
+    # The model loads off the event loop; until it's ready requests use the rule-based path
+    model_loading = asyncio.create_task(_load_model_in_background())
+    background = [model_loading, asyncio.create_task(run_lag_monitor())]
+    if risk_snapshot.SNAPSHOT_ENABLED:
+        background.append(asyncio.create_task(_run_snapshot_scheduler(model_loading)))
+    if MODEL_WATCH_INTERVAL > 0:
+        background.append(asyncio.create_task(_watch_model_registry(model_loading)))
+    yield
+    for task in background:
+        task.cancel()
+    push.close_all()
+    # Shared upstream HTTP clients and the inference pool live for the whole process
+    await close_clients()
+    executor.shutdown()
+    close_disk_cache()
+
+
+async def _load_model_in_background():
+    state = await asyncio.to_thread(load_model)
+    STARTUP_PROFILE["model_load_ms"] = round(state["load_seconds"] * 1000, 1)
+    STARTUP_PROFILE["ready_ms"] = round((time.perf_counter() - _import_started) * 1000, 1)
+    logger.info(f"Model {state['status']} in {STARTUP_PROFILE['model_load_ms']}ms "
+                f"(ready {STARTUP_PROFILE['ready_ms']}ms after import)")
+
+
+async def _watch_model_registry(model_loading: asyncio.Task):
+    """Hot-reload when the registry's current version changes. Loading happens off the event loop."""
+    await model_loading
+    attempted = None  # don't retry a version that already failed to load
+    while True:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL)
+        try:
+            version = await asyncio.to_thread(registry.current_version)
+            if version is not None and version not in (active_version(), attempted):
+                attempted = version
+                logger.info(f"Model registry now points at {version}; reloading")
+                state = await asyncio.to_thread(load_model, version)
+                logger.info(f"Model reload finished: {state['status']} {state['version']} {state['last_reload']}")
+        except Exception as e:
+            logger.error(f"Model registry watch failed: {e}", exc_info=True)
+
+
+async def _run_snapshot_scheduler(model_loading: asyncio.Task):
+    # The first snapshot should be scored by the trained model, not the fallback rules
+    await model_loading
+    await risk_snapshot.run_scheduler()
+
+
 app = FastAPI(
     title="FloodSense AI Cortex",
     description="Real-time flood risk prediction using Open-Meteo weather data and ML models",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -28,6 +113,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TimingMiddleware)
+# Outermost, so latency includes CORS handling and tracing
+app.add_middleware(metrics.MetricsMiddleware)
 
 
 # ─── Models ───────────────────────────────────────────
@@ -48,33 +136,170 @@ class TranslationRequest(BaseModel):
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "service": "AI Cortex v2.0 — Real Data", "apis": ["Open-Meteo", "NDMA SACHET"]}
+    return {
+        "status": "ok", "service": "AI Cortex v2.0 — Real Data", "apis": ["Open-Meteo", "NDMA SACHET"],
+        "model": model_state()["status"],
+    }
+
+
+@app.get("/health/live")
+def liveness():
+    """The process is up and serving (rule-based predictions work before the model loads)."""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+def readiness():
+    """Ready once model loading has finished — trained, absent or failed (then rule-based)."""
+    state = model_state()
+    ready = state["status"] not in ("not_loaded", "loading")
+    body = {"status": "ready" if ready else "loading", "model": state, "startup": STARTUP_PROFILE}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+@app.get("/stats/http")
+def http_pool_stats():
+    """Connection-pool usage and request batching for the shared Open-Meteo clients."""
+    return {"status": "success", "data": {**pool_stats(), "batching": batch_stats()}}
+
+
+@app.get("/stats/cache")
+def weather_cache_stats():
+    """Hit ratios and sizes of the weather/discharge caches."""
+    return {"status": "success", "data": cache_stats()}
+
+
+@app.get("/stats/runtime")
+def runtime_stats():
+    """Inference pool queue depth / wait time, event-loop lag and push subscriptions."""
+    return {"status": "success", "data": {
+        "inference": executor.executor_stats(),
+        "event_loop_lag": lag_stats(),
+        "push": push.push_stats(),
+    }}
+
+
+# ─── Metrics ─────────────────────────────────────────
+
+@metrics.register_collector
+def _collect_runtime_metrics() -> list:
+    """Gauges and counters already tracked by the cache, batcher, pool and executor stats."""
+    caches = cache_stats()
+    batches = batch_stats()
+    pool = pool_stats()["hosts"]
+    inference = executor.executor_stats()
+    state = model_state()
+    subscriptions = push.push_stats()
+    return [
+        ("cache_hits_total", "counter", "Fresh cache hits.",
+         [({"cache": name}, caches[name]["hits"]) for name in ("weather", "discharge")]),
+        ("cache_stale_hits_total", "counter", "Stale-while-revalidate cache hits.",
+         [({"cache": name}, caches[name]["stale_hits"]) for name in ("weather", "discharge")]),
+        ("cache_misses_total", "counter", "Cache misses.",
+         [({"cache": name}, caches[name]["misses"]) for name in ("weather", "discharge")]),
+        ("cache_disk_hits_total", "counter", "Memory misses served from the shared disk cache.",
+         [({"cache": name}, caches[name]["disk_hits"]) for name in ("weather", "discharge")]),
+        ("cache_hit_ratio", "gauge", "Fresh plus stale hits over all lookups since start.",
+         [({"cache": name}, caches[name]["hit_ratio"]) for name in ("weather", "discharge")]),
+        ("cache_entries", "gauge", "Entries held per cache.",
+         [({"cache": name}, caches[name]["size"]) for name in ("weather", "discharge")]),
+        ("upstream_window_fetches_total", "counter", "Per-cell upstream fetches by window (full or incremental).",
+         [({"upstream": name, "window": window}, caches["series"][name][window])
+          for name in ("weather", "discharge") for window in ("full", "incremental")]),
+        ("upstream_series_values_total", "counter", "Hourly (weather) or daily (discharge) values received.",
+         [({"upstream": name}, caches["series"][name]["values"]) for name in ("weather", "discharge")]),
+        ("singleflight_shared_total", "counter", "Fetches that joined an in-flight request.",
+         [({}, caches["singleflight"]["shared"])]),
+        ("upstream_batches_total", "counter", "Multi-location upstream calls.",
+         [({"upstream": name}, stats["batches"]) for name, stats in batches.items()]),
+        ("upstream_batch_points_total", "counter", "Locations sent in multi-location upstream calls.",
+         [({"upstream": name}, stats["points"]) for name, stats in batches.items()]),
+        ("upstream_in_flight", "gauge", "Upstream requests in flight per host.",
+         [({"host": host}, stats.get("in_flight", 0)) for host, stats in pool.items()]),
+        ("upstream_connections", "gauge", "Pooled upstream connections per host.",
+         [({"host": host}, stats["connections"]) for host, stats in pool.items()]),
+        ("inference_queue_depth", "gauge", "Inference calls waiting for a pool thread.",
+         [({}, inference["queue_depth"])]),
+        ("inference_running", "gauge", "Inference calls currently running.",
+         [({}, inference["running"])]),
+        ("event_loop_lag_last_seconds", "gauge", "Most recent event-loop lag sample.",
+         [({}, lag_stats()["last_ms"] / 1000)]),
+        ("model_info", "gauge", "Active model version and load status.",
+         [({"version": state["version"] or "none", "status": state["status"]}, 1)]),
+        ("model_reloads_total", "counter", "Successful model hot reloads.",
+         [({}, state["reloads"])]),
+        ("push_subscribers", "gauge", "Open /subscribe streams.",
+         [({}, subscriptions["subscribers"])]),
+        ("push_messages_total", "counter", "Update events sent to subscribers.",
+         [({}, subscriptions["messages"])]),
+        ("push_dropped_total", "counter", "Subscribers disconnected for falling behind.",
+         [({}, subscriptions["dropped"])]),
+    ]
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus text exposition of request, upstream, inference, cache and loop metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# ─── Admin ───────────────────────────────────────────
+
+class ModelReloadRequest(BaseModel):
+    version: Optional[str] = None
+
+
+@app.post("/admin/model/reload")
+async def reload_model(req: ModelReloadRequest, x_admin_token: Optional[str] = Header(None)):
+    """Load (and warm up) a model version off the request path, then swap it in. Disabled without ADMIN_TOKEN."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if req.version is not None and req.version not in registry.list_versions():
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {req.version}")
+    state = await asyncio.to_thread(load_model, req.version)
+    if state["error"]:
+        raise HTTPException(status_code=409, detail=state["error"])
+    if req.version is not None:
+        # Point the registry at it too, so the watcher doesn't switch back
+        await asyncio.to_thread(registry.set_current, req.version)
+    return {"status": "success", "model": state, "versions": registry.list_versions()}
+
+
+# ─── Response shaping ────────────────────────────────
+
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return, dotted for nested (e.g. risk.risk_level)")
+COMPACT_QUERY = Query(False, description="Drop daily arrays, trends, features_used and null fields")
 
 
 # ─── Core Prediction Endpoint ────────────────────────
 
 @app.post("/predict")
-async def predict_flood_risk(req: PredictRequest):
+async def predict_flood_risk(req: PredictRequest, fields: Optional[str] = FIELDS_QUERY,
+                             compact: bool = COMPACT_QUERY):
     """
     Main prediction endpoint. Fetches real weather data,
     computes ML features, and returns risk assessment.
     """
     try:
-        # Fetch real weather data from Open-Meteo
-        weather = await get_current_weather(req.lat, req.lon)
+        # Fetch real weather and river discharge data from Open-Meteo concurrently
+        weather, discharge = await asyncio.gather(
+            timed("weather", get_current_weather(req.lat, req.lon)),
+            timed("discharge", get_river_discharge(req.lat, req.lon)),
+        )
         logger.info(f"Weather for ({req.lat},{req.lon}): rain_24h={weather['rainfall_24h']}mm, soil={weather['soil_moisture']}")
-
-        # Fetch river discharge data
-        discharge = await get_river_discharge(req.lat, req.lon)
         logger.info(f"Discharge for ({req.lat},{req.lon}): {discharge['current_discharge']} m³/s")
 
-        # ML prediction
-        risk = predict_risk(weather, discharge)
+        # ML prediction (span includes the wait for an inference thread)
+        with span("inference"):
+            risk = await executor.run_inference(predict_risk, weather, discharge)
 
         # Generate alerts based on weather
-        alerts = interpret_weather_risk(weather)
+        with span("alerts"):
+            alerts = interpret_weather_risk(weather)
 
-        return {
+        return FastJSONResponse(shape({
             "status": "success",
             "location": {
                 "lat": req.lat,
@@ -86,24 +311,68 @@ async def predict_flood_risk(req: PredictRequest):
             "weather": weather,
             "discharge": discharge,
             "alerts": alerts,
-        }
+        }, parse_fields(fields), compact, keep=("status",)))
 
     except Exception as e:
         logger.error(f"Prediction error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+# ─── Forecast Horizon ────────────────────────────────
+
+@app.post("/predict/horizon")
+async def predict_horizon(req: PredictRequest, fields: Optional[str] = FIELDS_QUERY,
+                          compact: bool = COMPACT_QUERY):
+    """
+    Risk for every forecast hour from now to the end of the fetched forecast, scored
+    in one model call from the cached forecast, with the hour of peak risk. The first
+    point is the current hour, scored on the same features as /predict; later hours use
+    rolling 24h/7d rain, so they can step away from it at hour 1.
+    """
+    try:
+        weather, discharge = await asyncio.gather(
+            timed("weather", get_weather_snapshot(req.lat, req.lon)),
+            timed("discharge", get_discharge_snapshot(req.lat, req.lon)),
+        )
+        times, features = horizon_features(weather, discharge)
+        with span("inference"):
+            timeline, peak, peak_risk = await executor.run_inference(predict_risk_horizon, features, rows=len(features))
+
+        points = [
+            {"time": hour, **risk, "rainfall_24h": rain_24h, "rainfall_7d": rain_7d, "soil_moisture": soil}
+            for hour, risk, (rain_24h, rain_7d, soil) in zip(times, timeline, features[:, :3].tolist())
+        ]
+        return FastJSONResponse(shape({
+            "status": "success",
+            "location": {
+                "lat": req.lat,
+                "lon": req.lon,
+                "district": req.district_name,
+                "state": req.state_name,
+            },
+            "peak": {"time": times[peak], "hours_ahead": peak, **peak_risk} if timeline else None,
+            "timeline": points,
+        }, parse_fields(fields), compact, keep=("status",)))
+
+    except Exception as e:
+        logger.error(f"Horizon prediction error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Horizon prediction failed: {str(e)}")
+
+
 # ─── Weather Endpoint ────────────────────────────────
 
 @app.get("/weather")
 async def get_weather(
     lat: float = Query(..., description="Latitude"),
     lon: float = Query(..., description="Longitude"),
+    fields: Optional[str] = FIELDS_QUERY,
+    compact: bool = COMPACT_QUERY,
 ):
     """Fetch real-time weather for a location."""
     try:
-        weather = await get_current_weather(lat, lon)
-        return {"status": "success", "data": weather}
+        with span("weather"):
+            weather = await get_current_weather(lat, lon)
+        return FastJSONResponse({"status": "success", "data": shape(weather, parse_fields(fields), compact)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -117,7 +386,8 @@ async def get_discharge(
 ):
     """Fetch river discharge data for a location."""
     try:
-        discharge = await get_river_discharge(lat, lon)
+        with span("discharge"):
+            discharge = await get_river_discharge(lat, lon)
         return {"status": "success", "data": discharge}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -132,13 +402,58 @@ async def get_alerts(
 ):
     """Get flood alerts for a location based on current weather."""
     try:
-        weather = await get_current_weather(lat, lon)
-        alerts = interpret_weather_risk(weather)
+        with span("weather"):
+            weather = await get_current_weather(lat, lon)
+        with span("alerts"):
+            alerts = interpret_weather_risk(weather)
         return {"status": "success", "alerts": alerts}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/alerts/bulk")
+async def get_alerts_bulk(
+    state: Optional[str] = Query(None, description="State name (case-insensitive); all tracked districts if omitted"),
+    fields: Optional[str] = FIELDS_QUERY,
+    compact: bool = COMPACT_QUERY,
+):
+    """Alerts for every tracked district of a state, evaluated as one batch with one timestamp."""
+    districts = risk_snapshot.tracked_districts()
+    if state:
+        districts = [d for d in districts if d["state"].lower() == state.lower()]
+        if not districts:
+            raise HTTPException(status_code=404, detail=f"No tracked districts in state '{state}'")
+
+    with span("weather"):
+        fetched = await asyncio.gather(
+            *(asyncio.wait_for(get_weather_snapshot(d["lat"], d["lon"]), LOCATION_TIMEOUT) for d in districts),
+            return_exceptions=True,
+        )
+    ok = [i for i, item in enumerate(fetched) if not isinstance(item, BaseException)]
+    with span("alerts"):
+        alerts = interpret_weather_risk_batch(
+            [fetched[i] for i in ok], [(districts[i]["lat"], districts[i]["lon"]) for i in ok],
+        )
+    alerts_by_index = dict(zip(ok, alerts))
+
+    selected = parse_fields(fields)
+    results = []
+    for i, district in enumerate(districts):
+        entry = {
+            "lat": district["lat"],
+            "lon": district["lon"],
+            "district": district.get("district"),
+            "state": district.get("state"),
+        }
+        if i in alerts_by_index:
+            entry["alerts"] = alerts_by_index[i]
+            results.append(shape(entry, selected, compact))
+        else:
+            entry["error"] = str(fetched[i]) or type(fetched[i]).__name__
+            results.append(shape(entry, selected, compact, keep=("error",)))
+    return FastJSONResponse({"status": "success", "state": state, "count": len(results), "results": results})
+
+
 # ─── Bulk Predict (for map) ──────────────────────────
 
 class BulkPredictRequest(BaseModel):
@@ -146,31 +461,91 @@ class BulkPredictRequest(BaseModel):
 
 
 @app.post("/predict/bulk")
-async def predict_bulk(req: BulkPredictRequest):
-    """Predict risk for multiple locations at once (for map visualization)."""
+async def predict_bulk(req: BulkPredictRequest, fields: Optional[str] = FIELDS_QUERY,
+                       compact: bool = COMPACT_QUERY):
+    """
+    Predict risk for multiple locations at once (for map visualization).
+    `fields` and `compact` apply to each result; a failed location always keeps its error.
+    """
+    locations = req.locations[:BULK_MAX_LOCATIONS]
+    with span("fetch"):
+        fetched = await asyncio.gather(
+            *(get_location_data(loc.lat, loc.lon, LOCATION_TIMEOUT) for loc in locations),
+            return_exceptions=True,
+        )
+
+    # One batched model call for every location whose data arrived
+    ok = [i for i, item in enumerate(fetched) if not isinstance(item, BaseException)]
+    with span("inference"):
+        features = feature_matrix([fetched[i][0] for i in ok], [fetched[i][1] for i in ok])
+        risks = await executor.run_inference(predict_risk_features, features, rows=len(ok))
+    risk_by_index = dict(zip(ok, risks))
+
+    selected = parse_fields(fields)
     results = []
-    for loc in req.locations[:50]:  # Cap at 50 to avoid overload
-        try:
-            weather = await get_current_weather(loc.lat, loc.lon)
-            discharge = await get_river_discharge(loc.lat, loc.lon)
-            risk = predict_risk(weather, discharge)
-            results.append({
-                "lat": loc.lat,
-                "lon": loc.lon,
-                "district": loc.district_name,
-                "state": loc.state_name,
-                "risk_level": risk["risk_level"],
-                "risk_score": risk["risk_score"],
-                "probability": risk["probability"],
-                "rainfall_24h": weather["rainfall_24h"],
-            })
-        except Exception as e:
-            results.append({
+    for i, loc in enumerate(locations):
+        if i not in risk_by_index:
+            results.append(shape({
                 "lat": loc.lat, "lon": loc.lon,
                 "district": loc.district_name,
-                "error": str(e),
-            })
-    return {"status": "success", "results": results}
+                "error": str(fetched[i]) or type(fetched[i]).__name__,
+            }, selected, compact, keep=("error",)))
+            continue
+        weather, risk = fetched[i][0], risk_by_index[i]
+        results.append(shape({
+            "lat": loc.lat,
+            "lon": loc.lon,
+            "district": loc.district_name,
+            "state": loc.state_name,
+            "risk_level": risk["risk_level"],
+            "risk_score": risk["risk_score"],
+            "probability": risk["probability"],
+            "rainfall_24h": weather["rainfall_24h"],
+        }, selected, compact))
+    return FastJSONResponse({"status": "success", "results": results})
+
+
+# ─── Risk Snapshot (precomputed map data) ───────────
+
+@app.get("/risk/snapshot")
+def get_risk_snapshot(if_none_match: Optional[str] = Header(None)):
+    """Latest background-computed risk for all tracked districts. Supports If-None-Match."""
+    snapshot = risk_snapshot.current_snapshot()
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="Risk snapshot not ready yet")
+
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if if_none_match and snapshot.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+# ─── Push Subscriptions ──────────────────────────────
+
+@app.get("/subscribe")
+async def subscribe(
+    districts: Optional[str] = Query(None, description="Comma-separated district names"),
+    states: Optional[str] = Query(None, description="Comma-separated state names"),
+    bbox: Optional[List[str]] = Query(None, description="min_lon,min_lat,max_lon,max_lat; repeatable"),
+):
+    """
+    Server-Sent Events stream of risk and alert changes for the matching tracked districts
+    (all of them when no filter is given): a `snapshot` event, then an `update` event per
+    snapshot refresh that changes any of them. 503 when SNAPSHOT_ENABLED is off (nothing would ever be pushed).
+    """
+    if not risk_snapshot.SNAPSHOT_ENABLED:
+        raise HTTPException(status_code=503, detail="Push updates need SNAPSHOT_ENABLED")
+    try:
+        boxes = [push.parse_bbox(value) for value in bbox or []]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    body = push.stream(
+        {name.strip() for name in (districts or "").split(",") if name.strip()},
+        {name.strip() for name in (states or "").split(",") if name.strip()},
+        boxes,
+    )
+    return StreamingResponse(body, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # ─── Translation (keep existing) ─────────────────────
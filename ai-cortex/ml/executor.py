@@ -0,0 +1,99 @@
+"""
+Inference Executor — runs CPU-bound model calls on a dedicated thread pool
+so they don't block the asyncio event loop. XGBoost and NumPy release the
+GIL while predicting, so threads give real parallelism without having to
+load a model copy into every process.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services import metrics
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+
+_executor = None
+_lock = threading.Lock()
+_stats = {
+    "queued": 0,
+    "running": 0,
+    "completed": 0,
+    "total_wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+    "total_run_ms": 0.0,
+}
+
+
+async def run_inference(fn, *args, rows: int = 1):
+    """Run `fn(*args)` on the inference pool and await its result. `rows` is the batch size, for metrics."""
+    submitted = time.perf_counter()
+    timings = [0.0, 0.0]  # wait, run (seconds); recorded to metrics back on the event loop
+    dequeued = [False]
+    with _lock:
+        _stats["queued"] += 1
+
+    def job():
+        started = time.perf_counter()
+        timings[0] = started - submitted
+        wait_ms = timings[0] * 1000
+        with _lock:
+            dequeued[0] = True
+            _stats["queued"] -= 1
+            _stats["running"] += 1
+            _stats["total_wait_ms"] += wait_ms
+            _stats["max_wait_ms"] = max(_stats["max_wait_ms"], wait_ms)
+        try:
+            return fn(*args)
+        finally:
+            timings[1] = time.perf_counter() - started
+            with _lock:
+                _stats["running"] -= 1
+                _stats["completed"] += 1
+                _stats["total_run_ms"] += timings[1] * 1000
+
+    def leave_queue(_future):
+        """Jobs cancelled before they started (shutdown(cancel_futures=True), caller gone) leave the queue here."""
+        with _lock:
+            if not dequeued[0]:
+                dequeued[0] = True
+                _stats["queued"] -= 1
+
+    future = _get_executor().submit(job)
+    future.add_done_callback(leave_queue)
+    try:
+        return await asyncio.wrap_future(future)
+    finally:
+        metrics.inference_wait.observe(timings[0])
+        metrics.inference_duration.observe(timings[1])
+        metrics.inference_batch_size.observe(rows)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+    return _executor
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def executor_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    completed = stats["completed"]
+    return {
+        "workers": INFERENCE_WORKERS,
+        "queue_depth": stats["queued"],
+        "running": stats["running"],
+        "completed": completed,
+        "avg_wait_ms": round(stats["total_wait_ms"] / completed, 3) if completed else 0.0,
+        "max_wait_ms": round(stats["max_wait_ms"], 3),
+        "avg_run_ms": round(stats["total_run_ms"] / completed, 3) if completed else 0.0,
+    }
@@ -1,10 +1,19 @@
 """
 Flood Risk ML Model — XGBoost-based prediction using real weather features.
-Ships with a rule-based fallback if the trained model isn't available.
+Serves the trained trees from a compact NumPy export (no xgboost needed at
+runtime) and ships with a rule-based fallback if no trained model is available.
 """
 import numpy as np
 import os
 import logging
+import threading
+import time
+from datetime import datetime
+
+try:
+    from ml import registry
+except ImportError:  # imported as a top-level module by `python ml/train.py`
+    import registry
 
 logger = logging.getLogger(__name__)
 
@@ -22,88 +31,325 @@ FEATURE_NAMES = [
     "weather_code",       # WMO weather code
 ]
 
-# Try to load trained model
-_model = None
+TREES_PATH = os.path.join(os.path.dirname(__file__), "flood_model.npz")
+JOBLIB_PATH = os.path.join(os.path.dirname(__file__), "flood_model.joblib")
+
+
+class TreeEnsemble:
+    """
+    Array-backed gradient-boosted trees exported by train.export_trees.
+    All trees are flattened into shared node arrays; leaves point to themselves,
+    so walking every tree `max_depth` steps lands each row on its leaf.
+    """
+    CHUNK_ROWS = 4096  # bounds the (rows × trees) working set
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots, base_score, max_depth):
+        self.feature = feature            # int32 split feature per node (0 for leaves)
+        self.threshold = threshold        # float32 split threshold: x < threshold goes left
+        self.left = left                  # int32 child indices (self for leaves)
+        self.right = right
+        self.default_left = default_left  # bool: where missing (NaN) values go
+        self.value = value                # float32 leaf values (0 for inner nodes)
+        self.roots = roots                # int32 root node of each tree
+        self.base_score = np.float32(base_score)
+        self.max_depth = int(max_depth)
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = np.stack([left, right], axis=1).ravel()
+
+    @classmethod
+    def load(cls, path: str) -> "TreeEnsemble":
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Sum of leaf values plus base score, evaluated in float32 like XGBoost."""
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        out = np.empty(len(features), dtype=np.float32)
+        for start in range(0, len(features), self.CHUNK_ROWS):
+            chunk = features[start:start + self.CHUNK_ROWS]
+            flat = chunk.ravel()
+            row_offsets = (np.arange(len(chunk), dtype=np.int32) * chunk.shape[1])[:, None]
+            has_missing = np.isnan(flat).any()
+            node = np.repeat(self.roots[None, :], len(chunk), axis=0)
+            for _ in range(self.max_depth):
+                x = flat[row_offsets + self.feature[node]]
+                go_right = ~(x < self.threshold[node])
+                if has_missing:
+                    go_right = np.where(np.isnan(x), ~self.default_left[node], go_right)
+                node = self.children[2 * node + go_right]
+            out[start:start + len(chunk)] = self.value[node].sum(axis=1, dtype=np.float32) + self.base_score
+        return out
+
+
+# Active trained model as one (version, model) pair, replaced in a single assignment on reload.
+# Loaded off the import path by load_model(); until then predictions use the rules.
+_active = (None, None)
+_model_state = {
+    "status": "not_loaded", "version": None, "source": None,
+    "load_seconds": None, "error": None, "reloads": 0, "last_reload": None,
+}
+_load_lock = threading.Lock()
+
+# Canned batch (dry, monsoon, extreme) used to warm up and sanity-check a model before it goes live
+WARMUP_FEATURES = np.array([
+    [0.0, 2.0, 0.15, 20.0, 30.0, 15.0, 40.0, 32.0, 8.0, 0],
+    [45.0, 210.0, 0.72, 650.0, 900.0, 500.0, 90.0, 27.0, 18.0, 63],
+    [240.0, 620.0, 0.92, 6200.0, 8000.0, 4100.0, 97.0, 25.0, 35.0, 95],
+], dtype=np.float32)
+
+
+def _model_candidates(version: str = None) -> list:
+    """(version, path) pairs to try, best first: registry, then the bundled export, then joblib."""
+    if version is not None:
+        return [(version, registry.model_path(version))]
+    candidates = []
+    current = registry.current_version()
+    if current is not None:
+        candidates.append((current, registry.model_path(current)))
+    candidates.append(("bundled", TREES_PATH))
+    candidates.append(("joblib", JOBLIB_PATH))
+    return candidates
+
+
+def _read_model(path: str):
+    if path.endswith(".npz"):
+        return TreeEnsemble.load(path)
+    import joblib
+    return joblib.load(path)
 
-def _load_model():
-    global _model
-    model_path = os.path.join(os.path.dirname(__file__), "flood_model.joblib")
-    if os.path.exists(model_path):
-        try:
-            import joblib
-            _model = joblib.load(model_path)
-            logger.info(f"Loaded trained model from {model_path}")
-        except Exception as e:
-            logger.warning(f"Failed to load model: {e}. Using rule-based fallback.")
-            _model = None
-    else:
-        logger.info("No trained model found. Using rule-based prediction.")
 
-_load_model()
+def load_model(version: str = None) -> dict:
+    """
+    Load, warm up and activate a model — the registry's current version unless `version` is given.
+    Safe to run in a worker thread: batches already running keep the model they started with.
+    If a reload fails, the previously active model stays in place.
+    """
+    global _active
+    with _load_lock:
+        previous_version, previous_model = _active
+        _model_state.update(status="loading" if previous_model is None else "reloading", error=None)
+        started = time.perf_counter()
+        model, loaded_version, source, error = None, None, None, None
+
+        for candidate_version, path in _model_candidates(version):
+            if not os.path.exists(path):
+                continue
+            try:
+                model = _read_model(path)
+                loaded = time.perf_counter()
+                predictions = np.asarray(model.predict(WARMUP_FEATURES))
+                if not np.all(np.isfinite(predictions)):
+                    raise ValueError("warm-up batch produced non-finite predictions")
+                loaded_version, source, error = candidate_version, path, None
+                break
+            except Exception as e:
+                model, error = None, f"Failed to load model {candidate_version}: {e}"
+                logger.warning(f"{error}.")
+        if model is None and version is not None and error is None:
+            error = f"Model version {version} not found"
+        finished = time.perf_counter()
+
+        if model is not None:
+            _active = (loaded_version, model)
+            status = "ready"
+            logger.info(f"Loaded trained model {loaded_version} from {source}")
+        elif previous_model is not None:
+            status, loaded_version = "ready", previous_version  # keep serving the old model
+        elif error:
+            status = "failed"
+        else:
+            status = "rule-based"
+            logger.info("No trained model found. Using rule-based prediction.")
+
+        _model_state.update(
+            status=status, version=loaded_version, error=error,
+            source=source if model is not None else _model_state["source"],
+            load_seconds=round(finished - started, 4),
+        )
+        if previous_model is not None and model is not None:
+            _model_state["reloads"] += 1
+            _model_state["last_reload"] = {
+                "from": previous_version,
+                "to": loaded_version,
+                "load_ms": round((loaded - started) * 1000, 2),
+                "warmup_ms": round((finished - loaded) * 1000, 2),
+                "total_ms": round((finished - started) * 1000, 2),
+                "at": datetime.now().isoformat(),
+            }
+        return model_state()
+
+
+def active_version():
+    return _active[0]
+
+
+def model_state() -> dict:
+    return dict(_model_state)
+
+
+# Risk classification — probability >= threshold moves up one level
+RISK_THRESHOLDS = np.array([0.25, 0.5, 0.75])
+RISK_LEVELS = ["LOW", "MODERATE", "HIGH", "SEVERE"]
+RECOMMENDATIONS = [
+    "No immediate flood risk. Continue routine monitoring.",
+    "Stay alert. Monitor weather updates and river levels.",
+    "Prepare for possible flooding. Move valuables to higher ground.",
+    "Immediate evacuation recommended. Contact NDRF helpline 1078.",
+]
+
+# Rule-based fallback — (feature index, ascending thresholds, points awarded for exceeding each).
+# Only the highest threshold exceeded counts; rows add up in this order.
+RISK_RULES = [
+    (0, [20, 50, 100, 200], [0.1, 0.2, 0.3, 0.4]),      # Rainfall intensity (most important factor)
+    (1, [100, 200, 500], [0.08, 0.15, 0.25]),           # Cumulative rainfall
+    (2, [0.5, 0.8], [0.1, 0.2]),                        # Soil saturation (amplifies flood risk)
+    (3, [100, 1000, 5000], [0.03, 0.08, 0.15]),         # River discharge
+]
+
+# Contributing factors — (feature index, threshold, factor, value format, value scale, impact), in report order
+FACTOR_RULES = [
+    (0, 50, "Heavy Rainfall (24h)", "{:.1f}mm", 1, "HIGH"),
+    (1, 200, "Cumulative Rainfall (7d)", "{:.1f}mm", 1, "HIGH"),
+    (2, 0.7, "Soil Saturation", "{:.0f}%", 100, "HIGH"),
+    (3, 1000, "River Discharge", "{:.0f} m³/s", 1, "HIGH"),
+    (0, 20, "Moderate Rainfall", "{:.1f}mm", 1, "MODERATE"),
+    (2, 0.4, "Elevated Soil Moisture", "{:.0f}%", 100, "MODERATE"),
+]
+MAX_FACTORS = 5
+NORMAL_CONDITIONS = {"factor": "Normal Conditions", "value": "All parameters within safe range", "impact": "LOW"}
 
 
 def compute_features(weather: dict, discharge: dict) -> np.ndarray:
     """Build feature vector from real API data. MUST produce 10 features matching train.py."""
-    features = [
-        weather.get("rainfall_24h", 0),
-        weather.get("rainfall_7d", 0),
-        weather.get("soil_moisture", 0),
-        discharge.get("current_discharge", 0),
-        discharge.get("max_discharge_7d", 0),
-        discharge.get("avg_discharge_7d", 0),
-        weather.get("humidity", 50),
-        weather.get("temperature", 25),
-        weather.get("wind_speed", 0),
-        weather.get("weather_code", 0),
-    ]
-    return np.array(features).reshape(1, -1)
+    return compute_feature_matrix([weather], [discharge])
+
+
+def compute_feature_matrix(weathers: list, discharges: list) -> np.ndarray:
+    """Build an N×10 feature matrix, one row per weather/discharge record."""
+    return np.array([
+        [
+            weather.get("rainfall_24h", 0),
+            weather.get("rainfall_7d", 0),
+            weather.get("soil_moisture", 0),
+            discharge.get("current_discharge", 0),
+            discharge.get("max_discharge_7d", 0),
+            discharge.get("avg_discharge_7d", 0),
+            weather.get("humidity", 50),
+            weather.get("temperature", 25),
+            weather.get("wind_speed", 0),
+            weather.get("weather_code", 0),
+        ]
+        for weather, discharge in zip(weathers, discharges)
+    ], dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
 
 
 def predict_risk(weather: dict, discharge: dict) -> dict:
     """Predict flood risk from weather and discharge data."""
-    features = compute_features(weather, discharge)
+    return predict_risk_batch([weather], [discharge])[0]
 
-    if _model is not None:
-        try:
-            # XGBRegressor returns a float in [0, 1] — NOT predict_proba
-            raw = float(_model.predict(features)[0])
-            probability = min(1.0, max(0.0, raw))
-        except Exception as e:
-            logger.warning(f"Model prediction failed: {e}. Falling back to rules.")
-            probability = _rule_based_risk(features[0])
-    else:
-        probability = _rule_based_risk(features[0])
+
+def predict_risk_batch(weathers: list, discharges: list) -> list:
+    """Predict flood risk for many locations with a single model call."""
+    return predict_risk_features(compute_feature_matrix(weathers, discharges))
+
+
+def predict_risk_features(features: np.ndarray) -> list:
+    """Predict flood risk for each row of an N×10 feature matrix (FEATURE_NAMES order)."""
+    if len(features) == 0:
+        return []
+
+    version, model = _active  # read once so a concurrent reload can't mix models within a batch
+    probabilities = _predict_probabilities(model, features)
 
     # Classify
-    if probability >= 0.75:
-        risk_level = "SEVERE"
-        recommendation = "Immediate evacuation recommended. Contact NDRF helpline 1078."
-    elif probability >= 0.5:
-        risk_level = "HIGH"
-        recommendation = "Prepare for possible flooding. Move valuables to higher ground."
-    elif probability >= 0.25:
-        risk_level = "MODERATE"
-        recommendation = "Stay alert. Monitor weather updates and river levels."
-    else:
-        risk_level = "LOW"
-        recommendation = "No immediate flood risk. Continue routine monitoring."
-
-    # Contributing factors
-    factors = _get_contributing_factors(features[0])
+    levels = np.searchsorted(RISK_THRESHOLDS, probabilities, side="right")
+
+    factor_lists = _contributing_factors_batch(features)
+
+    label = f"trained@{version}" if model is not None else "rule-based"
+    return [
+        _risk_result(row, probability, level, factors, label)
+        for row, probability, level, factors in zip(features, probabilities.tolist(), levels.tolist(), factor_lists)
+    ]
+
 
+def predict_risk_horizon(features: np.ndarray) -> tuple:
+    """
+    Score one row per forecast hour in a single model call.
+    Returns (timeline of risk_level/risk_score/probability per row, index of the riskiest row, its full result).
+    """
+    if len(features) == 0:
+        return [], None, None
+
+    version, model = _active
+    probabilities = _predict_probabilities(model, features)
+    levels = np.searchsorted(RISK_THRESHOLDS, probabilities, side="right")
+
+    timeline = [
+        {"risk_level": RISK_LEVELS[level], "risk_score": round(probability * 10, 1),
+         "probability": round(probability, 3)}
+        for probability, level in zip(probabilities.tolist(), levels.tolist())
+    ]
+    peak = int(np.argmax(probabilities))  # earliest hour on ties
+    label = f"trained@{version}" if model is not None else "rule-based"
+    factors = _contributing_factors_batch(features[peak:peak + 1])[0]
+    return timeline, peak, _risk_result(features[peak], float(probabilities[peak]), int(levels[peak]), factors, label)
+
+
+def _risk_result(row: np.ndarray, probability: float, level: int, factors: list, label: str) -> dict:
     return {
-        "risk_level": risk_level,
+        "risk_level": RISK_LEVELS[level],
         "probability": round(probability, 3),
         "risk_score": round(probability * 10, 1),
         "contributing_factors": factors,
-        "recommendation": recommendation,
-        "model": "trained" if _model else "rule-based",
-        "features_used": dict(zip(FEATURE_NAMES, features[0].tolist())),
+        "recommendation": RECOMMENDATIONS[level],
+        "model": label,
+        "features_used": dict(zip(FEATURE_NAMES, row.tolist())),
     }
 
 
+def _predict_probabilities(model, features: np.ndarray) -> np.ndarray:
+    if model is not None:
+        try:
+            # XGBRegressor / TreeEnsemble return a float in [0, 1] — NOT predict_proba.
+            # Both evaluate in float32, so casting up front changes nothing.
+            raw = model.predict(features.astype(np.float32)).astype(np.float64)
+            return np.clip(raw, 0.0, 1.0)
+        except Exception as e:
+            logger.warning(f"Model prediction failed: {e}. Falling back to rules.")
+    return _rule_based_risk_batch(features)
+
+
+def _rule_based_risk_batch(features: np.ndarray) -> np.ndarray:
+    """Vectorized RISK_RULES over an N×10 matrix. Matches _rule_based_risk row for row."""
+    score = np.zeros(len(features))
+    for index, thresholds, points in RISK_RULES:
+        # Number of thresholds strictly exceeded picks the points; NaN exceeds none, like the scalar `>`
+        exceeded = (features[:, index, None] > np.asarray(thresholds)).sum(axis=1)
+        score += np.asarray([0.0] + points)[exceeded]
+    return np.clip(score, 0.0, 1.0)
+
+
+def _contributing_factors_batch(features: np.ndarray) -> list:
+    """Vectorized FACTOR_RULES over an N×10 matrix. Matches _get_contributing_factors row for row."""
+    factor_lists = [[] for _ in range(len(features))]
+    # Rules are applied column by column in report order, so each row's list keeps the scalar ordering
+    for index, threshold, factor, fmt, scale, impact in FACTOR_RULES:
+        column = features[:, index]
+        rows = np.flatnonzero(column > threshold)
+        for row, value in zip(rows.tolist(), (column[rows] * scale).tolist()):
+            factor_lists[row].append({"factor": factor, "value": fmt.format(value), "impact": impact})
+    for factors in factor_lists:
+        if not factors:
+            factors.append(dict(NORMAL_CONDITIONS))
+        elif len(factors) > MAX_FACTORS:
+            del factors[MAX_FACTORS:]
+    return factor_lists
+
+
 def _rule_based_risk(features: np.ndarray) -> float:
-    """Physics-informed rule-based risk when no trained model is available."""
+    """Physics-informed rule-based risk when no trained model is available.
+    Scalar reference for _rule_based_risk_batch, kept for parity checks."""
     rainfall_24h = features[0]
     rainfall_7d = features[1]
     soil_moisture = features[2]
@@ -147,7 +393,8 @@ def _rule_based_risk(features: np.ndarray) -> float:
 
 
 def _get_contributing_factors(features: np.ndarray) -> list:
-    """Identify top contributing factors for explainability."""
+    """Identify top contributing factors for explainability.
+    Scalar reference for _contributing_factors_batch, kept for parity checks."""
     factors = []
     if features[0] > 50:
         factors.append({"factor": "Heavy Rainfall (24h)", "value": f"{features[0]:.1f}mm", "impact": "HIGH"})
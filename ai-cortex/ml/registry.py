@@ -0,0 +1,80 @@
+"""
+Model Registry — versioned on-disk store of exported models.
+Layout:
+    registry/
+        CURRENT                  # name of the active version
+        <version>/flood_model.npz
+        <version>/metadata.json
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+
+REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(os.path.dirname(__file__), "registry"))
+MODEL_FILE = "flood_model.npz"
+CURRENT_FILE = "CURRENT"
+
+
+def list_versions(registry_dir: str = REGISTRY_DIR) -> list:
+    """Versions that contain a model file, oldest first."""
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(registry_dir)
+        if os.path.isfile(os.path.join(registry_dir, name, MODEL_FILE))
+    )
+
+
+def current_version(registry_dir: str = REGISTRY_DIR):
+    """The version named in CURRENT, else the newest version, else None."""
+    pointer = os.path.join(registry_dir, CURRENT_FILE)
+    if os.path.isfile(pointer):
+        with open(pointer) as f:
+            version = f.read().strip()
+        if version in list_versions(registry_dir):
+            return version
+    versions = list_versions(registry_dir)
+    return versions[-1] if versions else None
+
+
+def check_version(version: str) -> str:
+    """A version is a single directory name: no path separators, no '..'."""
+    if not version or ".." in version or any(sep and sep in version for sep in (os.sep, os.altsep, "/")):
+        raise ValueError(f"Invalid model version name: {version!r}")
+    return version
+
+
+def model_path(version: str, registry_dir: str = REGISTRY_DIR) -> str:
+    return os.path.join(registry_dir, check_version(version), MODEL_FILE)
+
+
+def publish(source_path: str, version: str = None, metadata: dict = None,
+            registry_dir: str = REGISTRY_DIR, activate: bool = True) -> str:
+    """Copy an exported model into a new version directory and (optionally) make it current."""
+    version = check_version(version or datetime.now().strftime("v%Y%m%d-%H%M%S"))
+    target_dir = os.path.join(registry_dir, version)
+    if os.path.exists(target_dir):
+        raise FileExistsError(f"Model version {version} already exists in {registry_dir}")
+
+    # Stage then rename, so watchers never see a half-written version
+    staging_dir = os.path.join(registry_dir, f".{version}.tmp")
+    os.makedirs(staging_dir, exist_ok=True)
+    shutil.copyfile(source_path, os.path.join(staging_dir, MODEL_FILE))
+    with open(os.path.join(staging_dir, "metadata.json"), "w") as f:
+        json.dump({"version": version, "published_at": datetime.now().isoformat(), **(metadata or {})}, f, indent=2)
+    os.rename(staging_dir, target_dir)
+
+    if activate:
+        set_current(version, registry_dir)
+    return version
+
+
+def set_current(version: str, registry_dir: str = REGISTRY_DIR):
+    if not os.path.isfile(model_path(version, registry_dir)):
+        raise FileNotFoundError(f"Model version {version} not found in {registry_dir}")
+    pointer = os.path.join(registry_dir, CURRENT_FILE)
+    tmp = f"{pointer}.tmp"
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, pointer)
@@ -4,74 +4,106 @@ Trains an XGBoost model on synthetic data patterned after INDOFLOODS dataset.
 Run: python ml/train.py
 """
 import numpy as np
+import json
 import os
+import sys
 import logging
 
+try:
+    from ml import registry
+except ImportError:  # run as `python ml/train.py`
+    import registry
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "flood_model.joblib")
+TREES_PATH = os.path.join(os.path.dirname(__file__), "flood_model.npz")
+# Max allowed |TreeEnsemble - XGBoost| on the verification sample
+EXPORT_TOLERANCE = 1e-5
+
+WEATHER_CODES = np.array([0, 1, 2, 3, 51, 53, 55, 61, 63, 65, 80, 81, 82, 95, 96, 99])
+HEAVY_RAIN_CODES = [63, 65, 82, 95, 96, 99]
+MODERATE_RAIN_CODES = [53, 55, 61, 80, 81]
+# Rows per chunk when streaming a dataset to disk
+GENERATION_CHUNK_ROWS = 1_000_000
+
 
-def generate_training_data(n_samples: int = 5000) -> tuple:
+def generate_training_data(n_samples: int = 5000, seed: int = 42) -> tuple:
     """Generate synthetic flood data modeled on Indian flood patterns."""
-    np.random.seed(42)
-    
+    return _generate_chunk(np.random.default_rng(seed), n_samples)
+
+
+def _generate_chunk(rng: np.random.Generator, n: int) -> tuple:
+    """
+    One vectorized pass over n samples. Each monsoon/dry feature draws from the
+    same distribution as before, with per-row parameters picked by season.
+    """
     # Features: rainfall_24h, rainfall_7d, soil_moisture, discharge, max_discharge_7d,
     #           avg_discharge_7d, humidity, temperature, wind_speed, weather_code
-    
-    X = np.zeros((n_samples, 10))
-    y = np.zeros(n_samples)
-    
-    for i in range(n_samples):
-        # Simulate seasonal patterns (monsoon vs dry)
-        is_monsoon = np.random.random() < 0.4
-        
-        if is_monsoon:
-            rainfall_24h = np.random.exponential(30) + np.random.uniform(5, 20)
-            rainfall_7d = rainfall_24h * np.random.uniform(3, 7)
-            soil_moisture = np.random.uniform(0.5, 0.95)
-            discharge = np.random.exponential(200) + 50
-            humidity = np.random.uniform(70, 98)
-            temperature = np.random.uniform(22, 35)
-        else:
-            rainfall_24h = np.random.exponential(5)
-            rainfall_7d = rainfall_24h * np.random.uniform(1, 4)
-            soil_moisture = np.random.uniform(0.1, 0.5)
-            discharge = np.random.exponential(50) + 10
-            humidity = np.random.uniform(30, 70)
-            temperature = np.random.uniform(15, 42)
-        
-        max_discharge_7d = discharge * np.random.uniform(1.0, 2.5)
-        avg_discharge_7d = discharge * np.random.uniform(0.6, 1.0)
-        wind_speed = np.random.uniform(0, 40)
-        weather_code = np.random.choice([0, 1, 2, 3, 51, 53, 55, 61, 63, 65, 80, 81, 82, 95, 96, 99])
-        
-        X[i] = [rainfall_24h, rainfall_7d, soil_moisture, discharge,
-                max_discharge_7d, avg_discharge_7d, humidity, temperature,
-                wind_speed, weather_code]
-        
-        # Compute flood probability based on physics
-        risk = 0.0
-        risk += min(rainfall_24h / 100, 1.0) * 3.0      # Rainfall impact
-        risk += min(rainfall_7d / 400, 1.0) * 2.0        # Cumulative rain
-        risk += soil_moisture * 2.5                        # Saturated soil
-        risk += min(discharge / 500, 1.0) * 2.0           # River discharge
-        risk += (humidity / 100) * 0.5                     # Humidity
-        
-        # Heavy rain weather codes increase risk
-        if weather_code in [63, 65, 82, 95, 96, 99]:
-            risk += 1.5
-        elif weather_code in [53, 55, 61, 80, 81]:
-            risk += 0.5
-        
-        # Normalize to 0-1
-        y[i] = min(max(risk / 10.0, 0.0), 1.0)
-        # Add small noise
-        y[i] = min(max(y[i] + np.random.normal(0, 0.05), 0.0), 1.0)
-    
+    X = np.empty((n, 10))
+
+    # Simulate seasonal patterns (monsoon vs dry)
+    is_monsoon = rng.random(n) < 0.4
+
+    def seasonal(monsoon, dry):
+        return np.where(is_monsoon, monsoon, dry)
+
+    rainfall_24h = rng.exponential(seasonal(30.0, 5.0)) + seasonal(rng.uniform(5, 20, n), 0.0)
+    X[:, 0] = rainfall_24h
+    X[:, 1] = rainfall_24h * rng.uniform(seasonal(3.0, 1.0), seasonal(7.0, 4.0))
+    X[:, 2] = rng.uniform(seasonal(0.5, 0.1), seasonal(0.95, 0.5))
+    X[:, 3] = discharge = rng.exponential(seasonal(200.0, 50.0)) + seasonal(50.0, 10.0)
+    X[:, 4] = discharge * rng.uniform(1.0, 2.5, n)
+    X[:, 5] = discharge * rng.uniform(0.6, 1.0, n)
+    X[:, 6] = rng.uniform(seasonal(70.0, 30.0), seasonal(98.0, 70.0))
+    X[:, 7] = rng.uniform(seasonal(22.0, 15.0), seasonal(35.0, 42.0))
+    X[:, 8] = rng.uniform(0, 40, n)
+    X[:, 9] = weather_code = rng.choice(WEATHER_CODES, n)
+
+    # Compute flood probability based on physics
+    risk = np.minimum(rainfall_24h / 100, 1.0) * 3.0      # Rainfall impact
+    risk += np.minimum(X[:, 1] / 400, 1.0) * 2.0          # Cumulative rain
+    risk += X[:, 2] * 2.5                                 # Saturated soil
+    risk += np.minimum(discharge / 500, 1.0) * 2.0        # River discharge
+    risk += (X[:, 6] / 100) * 0.5                         # Humidity
+
+    # Heavy rain weather codes increase risk
+    risk += np.where(np.isin(weather_code, HEAVY_RAIN_CODES), 1.5,
+                     np.where(np.isin(weather_code, MODERATE_RAIN_CODES), 0.5, 0.0))
+
+    # Normalize to 0-1, then add small noise
+    y = np.clip(risk / 10.0, 0.0, 1.0)
+    y = np.clip(y + rng.normal(0, 0.05, n), 0.0, 1.0)
     return X, y
 
 
+def generate_training_data_to_disk(n_samples: int, out_dir: str, seed: int = 42,
+                                   chunk_rows: int = GENERATION_CHUNK_ROWS) -> tuple:
+    """
+    Stream n_samples rows into memory-mapped X.npy / y.npy (float32) under out_dir,
+    one chunk at a time, so dataset size is bounded by disk rather than RAM.
+    Each chunk gets its own child seed, so the output only depends on seed and chunk_rows.
+    Returns the two paths; open them with np.load(path, mmap_mode="r").
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    x_path, y_path = os.path.join(out_dir, "X.npy"), os.path.join(out_dir, "y.npy")
+    X_out = np.lib.format.open_memmap(x_path, mode="w+", dtype=np.float32, shape=(n_samples, 10))
+    y_out = np.lib.format.open_memmap(y_path, mode="w+", dtype=np.float32, shape=(n_samples,))
+
+    n_chunks = -(-n_samples // chunk_rows)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        start = i * chunk_rows
+        stop = min(start + chunk_rows, n_samples)
+        X_out[start:stop], y_out[start:stop] = _generate_chunk(np.random.default_rng(child), stop - start)
+        logger.info(f"Generated rows {start:,}–{stop:,} of {n_samples:,}")
+
+    X_out.flush()
+    y_out.flush()
+    del X_out, y_out
+    return x_path, y_path
+
+
 def train_model():
     """Train XGBoost model and save to disk."""
     try:
@@ -124,14 +156,110 @@ def train_model():
     # Save model
     dump(model, MODEL_PATH)
     logger.info(f"Model saved to {MODEL_PATH}")
+
+    # Export the serving artifact (pure-NumPy trees, no xgboost needed at runtime)
+    export_trees(model, TREES_PATH, X_test)
+
+    # Publish as a new registry version — running servers hot-reload it
+    version = registry.publish(TREES_PATH, metadata={"mae": round(float(mae), 6), "r2": round(float(r2), 6)})
+    logger.info(f"Published model version {version} to {registry.REGISTRY_DIR}")
     
     return True
 
 
+def export_trees(model, path: str = TREES_PATH, X_check: np.ndarray = None) -> dict:
+    """
+    Flatten the booster's trees into shared node arrays for model.TreeEnsemble
+    and verify the exported ensemble reproduces XGBoost's predictions.
+    """
+    learner = json.loads(_as_booster(model).save_raw("json"))["learner"]
+    trees = learner["gradient_booster"]["model"]["trees"]
+    # Stored like "[3.7856147E-1]" in recent xgboost, or a plain number in older versions
+    base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+
+    feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+    max_depth = 0
+    for tree in trees:
+        offset = len(feature)
+        roots.append(offset)
+        lefts, rights = tree["left_children"], tree["right_children"]
+        depth = {0: 0}
+        for node, (l, r) in enumerate(zip(lefts, rights)):
+            is_leaf = l == -1
+            feature.append(0 if is_leaf else tree["split_indices"][node])
+            threshold.append(0.0 if is_leaf else tree["split_conditions"][node])
+            # Leaves loop back to themselves so extra traversal steps are no-ops
+            left.append(offset + node if is_leaf else offset + l)
+            right.append(offset + node if is_leaf else offset + r)
+            default_left.append(bool(tree["default_left"][node]))
+            # XGBoost stores leaf values in split_conditions
+            value.append(tree["split_conditions"][node] if is_leaf else 0.0)
+            if not is_leaf:
+                depth[l] = depth[r] = depth[node] + 1
+                max_depth = max(max_depth, depth[node] + 1)
+
+    arrays = {
+        "feature": np.asarray(feature, dtype=np.int32),
+        "threshold": np.asarray(threshold, dtype=np.float32),
+        "left": np.asarray(left, dtype=np.int32),
+        "right": np.asarray(right, dtype=np.int32),
+        "default_left": np.asarray(default_left, dtype=bool),
+        "value": np.asarray(value, dtype=np.float32),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "base_score": np.float32(base_score),
+        "max_depth": np.int32(max_depth),
+    }
+    np.savez_compressed(path, **arrays)
+    logger.info(f"Exported {len(trees)} trees ({len(feature)} nodes, depth {max_depth}) to {path}")
+
+    if X_check is None:
+        X_check, _ = generate_training_data(2000)
+    max_error = verify_export(model, path, X_check)
+    logger.info(f"Export verified — max |error| vs XGBoost: {max_error:.2e}")
+    return arrays
+
+
+def verify_export(model, path: str, X: np.ndarray) -> float:
+    """Max absolute difference between the exported ensemble and XGBoost, with some missing values."""
+    try:
+        from ml.model import TreeEnsemble
+    except ImportError:  # run as `python ml/train.py`
+        from model import TreeEnsemble
+
+    X = np.array(X, dtype=np.float32)
+    X[::7, 2] = np.nan  # exercise default (missing-value) branches
+    max_error = float(np.max(np.abs(TreeEnsemble.load(path).predict(X) - _as_booster(model).inplace_predict(X))))
+    if max_error > EXPORT_TOLERANCE:
+        raise ValueError(f"Exported trees differ from XGBoost by {max_error:.2e} (> {EXPORT_TOLERANCE:g})")
+    return max_error
+
+
+def _as_booster(model):
+    """Accept either an XGBRegressor or a raw xgboost Booster."""
+    return model.get_booster() if hasattr(model, "get_booster") else model
+
+
+def export_saved_model() -> bool:
+    """Export trees from an existing flood_model.joblib without retraining."""
+    from joblib import load
+    export_trees(load(MODEL_PATH), TREES_PATH)
+    return True
+
+
 if __name__ == "__main__":
-    success = train_model()
+    if "--generate-dataset" in sys.argv:
+        # python ml/train.py --generate-dataset 10000000 data/training
+        arg = sys.argv.index("--generate-dataset")
+        n_rows, out_dir = int(sys.argv[arg + 1]), sys.argv[arg + 2]
+        paths = generate_training_data_to_disk(n_rows, out_dir)
+        print(f"\n✅ Generated {n_rows:,} rows: {', '.join(paths)}")
+        sys.exit(0)
+
+    export_only = "--export-only" in sys.argv
+    success = export_saved_model() if export_only else train_model()
     if success:
-        print("\n✅ Model trained and saved successfully!")
+        print(f"\n✅ Model {'exported' if export_only else 'trained and saved'} successfully!")
         print(f"   Path: {MODEL_PATH}")
+        print(f"   Serving trees: {TREES_PATH}")
     else:
         print("\n⚠️ Training failed — check dependencies")
@@ -0,0 +1,279 @@
+"""
+FloodSense Hyperparameter Search
+Cross-validated grid search over XGBoost parameters. Each fold's data is cached
+to disk and quantized once into a QuantileDMatrix (hist method) that every
+candidate reuses; candidates train in parallel threads with early stopping.
+Writes a report of wall time, MAE/R² and TreeEnsemble serving latency per candidate.
+Run: python ml/tune.py [--samples N | --data DIR] [--workers N] [--publish]
+"""
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+try:
+    from ml import registry
+    from ml.model import TreeEnsemble
+    from ml.train import generate_training_data, export_trees
+except ImportError:  # run as `python ml/tune.py`
+    import registry
+    from model import TreeEnsemble
+    from train import generate_training_data, export_trees
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("TUNE_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".tune_cache"))
+REPORT_PATH = os.path.join(os.path.dirname(__file__), "tune_report.json")
+
+N_FOLDS = 4
+TEST_FRACTION = 0.2
+MAX_BIN = 256
+NUM_BOOST_ROUND = 1000
+EARLY_STOPPING_ROUNDS = 30
+# Rows per TreeEnsemble.predict call when measuring serving cost (1 = /predict, 100 = a bulk map call)
+LATENCY_BATCHES = [1, 100]
+
+FIXED_PARAMS = {
+    "objective": "reg:squarederror",
+    "tree_method": "hist",
+    "max_bin": MAX_BIN,
+    "eval_metric": "mae",
+    "seed": 42,
+    "verbosity": 0,
+}
+SEARCH_GRID = {
+    "max_depth": [4, 6, 8],
+    "learning_rate": [0.05, 0.1],
+    "min_child_weight": [1, 5],
+    "subsample": [0.8],
+    "colsample_bytree": [0.8, 1.0],
+}
+
+
+def candidates(grid: dict = SEARCH_GRID) -> list:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def load_dataset(samples: int, data_dir: str = None) -> tuple:
+    """
+    (X, y, cache_key). Either synthetic data, or X.npy / y.npy written by
+    `train.py --generate-dataset`, opened memory-mapped.
+    """
+    if data_dir:
+        x_path, y_path = os.path.join(data_dir, "X.npy"), os.path.join(data_dir, "y.npy")
+        stat = os.stat(x_path)
+        key = f"{os.path.abspath(x_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r"), key
+    X, y = generate_training_data(samples)
+    return X, y, f"synthetic:{samples}:42"
+
+
+def cache_folds(X: np.ndarray, y: np.ndarray, key: str, n_folds: int = N_FOLDS,
+                cache_dir: str = CACHE_DIR) -> str:
+    """
+    Split off a test set and K train/valid folds, saving each as float32 .npy
+    under a directory named by the dataset key. Reused as-is on later runs.
+    """
+    fold_dir = os.path.join(cache_dir, hashlib.sha1(f"{key}:{n_folds}:{TEST_FRACTION}".encode()).hexdigest()[:16])
+    if os.path.isfile(os.path.join(fold_dir, "DONE")):
+        logger.info(f"Using cached folds in {fold_dir}")
+        return fold_dir
+
+    logger.info(f"Caching {n_folds} folds to {fold_dir}")
+    os.makedirs(fold_dir, exist_ok=True)
+    order = np.random.default_rng(42).permutation(len(y))
+    n_test = int(len(y) * TEST_FRACTION)
+    test, rest = np.sort(order[:n_test]), order[n_test:]
+
+    def save(name, idx):
+        np.save(os.path.join(fold_dir, f"{name}_X.npy"), np.asarray(X[idx], dtype=np.float32))
+        np.save(os.path.join(fold_dir, f"{name}_y.npy"), np.asarray(y[idx], dtype=np.float32))
+
+    save("test", test)
+    save("train_all", np.sort(rest))
+    for k, valid in enumerate(np.array_split(rest, n_folds)):
+        save(f"fold{k}_train", np.sort(np.setdiff1d(rest, valid)))
+        save(f"fold{k}_valid", np.sort(valid))
+    with open(os.path.join(fold_dir, "DONE"), "w") as f:
+        f.write(key)
+    return fold_dir
+
+
+def load_split(fold_dir: str, name: str) -> tuple:
+    return (np.load(os.path.join(fold_dir, f"{name}_X.npy"), mmap_mode="r"),
+            np.load(os.path.join(fold_dir, f"{name}_y.npy"), mmap_mode="r"))
+
+
+def build_fold_matrices(fold_dir: str, n_folds: int = N_FOLDS) -> list:
+    """One quantized (train, valid, y_valid) per fold; valid shares the train bin edges."""
+    import xgboost as xgb
+
+    folds = []
+    for k in range(n_folds):
+        X_train, y_train = load_split(fold_dir, f"fold{k}_train")
+        X_valid, y_valid = load_split(fold_dir, f"fold{k}_valid")
+        dtrain = xgb.QuantileDMatrix(X_train, y_train, max_bin=MAX_BIN)
+        dvalid = xgb.QuantileDMatrix(X_valid, y_valid, ref=dtrain)
+        folds.append((dtrain, dvalid, np.asarray(y_valid)))
+    return folds
+
+
+def evaluate_candidate(params: dict, folds: list, nthread: int) -> tuple:
+    """Cross-validate one parameter set. Returns (result, last fold's booster trimmed to its best round)."""
+    import xgboost as xgb
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    started = time.perf_counter()
+    maes, r2s, rounds, booster = [], [], [], None
+    for dtrain, dvalid, y_valid in folds:
+        booster = xgb.train(
+            {**FIXED_PARAMS, **params, "nthread": nthread}, dtrain,
+            num_boost_round=NUM_BOOST_ROUND,
+            evals=[(dvalid, "valid")],
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+            verbose_eval=False,
+        )
+        best = booster.best_iteration + 1
+        pred = booster.predict(dvalid, iteration_range=(0, best))
+        maes.append(mean_absolute_error(y_valid, pred))
+        r2s.append(r2_score(y_valid, pred))
+        rounds.append(best)
+
+    return {
+        "params": params,
+        "mae": round(float(np.mean(maes)), 6),
+        "mae_std": round(float(np.std(maes)), 6),
+        "r2": round(float(np.mean(r2s)), 6),
+        "rounds": int(round(np.mean(rounds))),
+        "wall_seconds": round(time.perf_counter() - started, 3),
+    }, booster[: rounds[-1]]
+
+
+def serving_latency(booster, X_latency: np.ndarray) -> dict:
+    """Serving cost is what the API pays: the booster exported and run as a TreeEnsemble."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "candidate.npz")
+        export_trees(booster, path, X_latency[:500])
+        ensemble = TreeEnsemble.load(path)
+    return {f"batch_{n}_us_per_row": round(_predict_us_per_row(ensemble, X_latency[:n]), 2)
+            for n in LATENCY_BATCHES}
+
+
+def _predict_us_per_row(ensemble: TreeEnsemble, X: np.ndarray, min_seconds: float = 0.2) -> float:
+    ensemble.predict(X)  # warm-up
+    runs, start = 0, time.perf_counter()
+    while True:
+        ensemble.predict(X)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / (runs * len(X)) * 1e6
+
+
+def search(samples: int = 20_000, data_dir: str = None, workers: int = None,
+           grid: dict = SEARCH_GRID, report_path: str = REPORT_PATH) -> dict:
+    """Run the grid search and write the report. Candidates are ranked by CV MAE."""
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    # Split cores between concurrent candidates; xgboost releases the GIL while training
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+
+    X, y, key = load_dataset(samples, data_dir)
+    fold_dir = cache_folds(X, y, key)
+    folds = build_fold_matrices(fold_dir)
+    X_latency = np.ascontiguousarray(load_split(fold_dir, "test")[0][:max(LATENCY_BATCHES + [500])])
+
+    grid_candidates = candidates(grid)
+    logger.info(f"Searching {len(grid_candidates)} candidates × {N_FOLDS} folds "
+                f"on {workers} worker(s) × {nthread} thread(s)")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tune") as pool:
+        evaluated = list(pool.map(lambda p: evaluate_candidate(p, folds, nthread), grid_candidates))
+    # Timed one at a time after training, so candidates don't skew each other's latency
+    results = [{**result, "latency": serving_latency(booster, X_latency)} for result, booster in evaluated]
+    results.sort(key=lambda r: r["mae"])
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "dataset": key,
+        "rows": len(y),
+        "folds": N_FOLDS,
+        "workers": workers,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "fixed_params": FIXED_PARAMS,
+        "candidates": results,
+    }
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Search finished in {report['wall_seconds']}s — report written to {report_path}")
+    return report
+
+
+def publish_best(report: dict, data_dir: str = None, samples: int = 20_000) -> str:
+    """Refit the best candidate on all non-test rows, check it on the test set, export and publish."""
+    import xgboost as xgb
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    best = report["candidates"][0]
+    X, y, key = load_dataset(samples, data_dir)
+    fold_dir = cache_folds(X, y, key)
+    X_train, y_train = load_split(fold_dir, "train_all")
+    X_test, y_test = load_split(fold_dir, "test")
+
+    booster = xgb.train({**FIXED_PARAMS, **best["params"]},
+                        xgb.QuantileDMatrix(X_train, y_train, max_bin=MAX_BIN),
+                        num_boost_round=best["rounds"])
+    pred = booster.inplace_predict(X_test)
+    mae, r2 = mean_absolute_error(y_test, pred), r2_score(y_test, pred)
+    logger.info(f"Best candidate on test set — MAE: {mae:.4f}, R²: {r2:.4f}")
+
+    # The bundled ml/flood_model.npz stays as shipped (it mirrors flood_model.joblib); only the registry changes
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "flood_model.npz")
+        export_trees(booster, path, np.asarray(X_test[:2000]))
+        version = registry.publish(path, metadata={
+            "mae": round(float(mae), 6), "r2": round(float(r2), 6),
+            "params": best["params"], "rounds": best["rounds"],
+        })
+    logger.info(f"Published model version {version} to {registry.REGISTRY_DIR}")
+    return version
+
+
+def _arg(name: str, default=None):
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+
+if __name__ == "__main__":
+    try:
+        import xgboost  # noqa: F401
+        import sklearn  # noqa: F401
+    except ImportError:
+        print("\n⚠️ Tuning needs the training dependencies: pip install -r requirements-train.txt")
+        sys.exit(1)
+
+    workers = _arg("--workers")
+    report = search(
+        samples=int(_arg("--samples", 20_000)),
+        data_dir=_arg("--data"),
+        workers=int(workers) if workers else None,
+    )
+    print(f"\n{'max_depth':>9} {'lr':>5} {'mcw':>4} {'colsample':>9} {'rounds':>6} "
+          f"{'MAE':>8} {'R²':>7} {'wall s':>7} {'µs/row@1':>9} {'µs/row@100':>11}")
+    for r in report["candidates"]:
+        p, lat = r["params"], r["latency"]
+        print(f"{p['max_depth']:>9} {p['learning_rate']:>5} {p['min_child_weight']:>4} "
+              f"{p['colsample_bytree']:>9} {r['rounds']:>6} {r['mae']:>8.4f} {r['r2']:>7.4f} "
+              f"{r['wall_seconds']:>7.2f} {lat['batch_1_us_per_row']:>9.1f} {lat['batch_100_us_per_row']:>11.2f}")
+
+    if "--publish" in sys.argv:
+        version = publish_best(report, data_dir=_arg("--data"), samples=int(_arg("--samples", 20_000)))
+        print(f"\n✅ Published best candidate as {version}")
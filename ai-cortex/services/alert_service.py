@@ -3,9 +3,13 @@ Alert Service — fetches real flood warnings from NDMA SACHET portal
 and Open-Meteo weather interpretation.
 """
 import httpx
+import operator
+import string
 from datetime import datetime
 from typing import List
 
+import numpy as np
+
 
 # Weather code to description mapping (WMO codes from Open-Meteo)
 WEATHER_CODES = {
@@ -26,108 +30,151 @@ FLOOD_PRONE_STATES = [
 ]
 
 
+ANALYSIS_SOURCE = "FloodSense AI Analysis"
+
+# Alert rules in report order — (id prefix, field, comparison, ascending thresholds, one tier per threshold).
+# Comparisons are `operator` functions, so they apply to scalars and NumPy columns alike.
+# A rule fires at most once per location, with the tier of the highest threshold passed.
+# Tier: (type, severity, title, message template, recommendation, source). Templates take
+# rainfall_24h, rainfall_7d, soil_percent (soil_moisture * 100) and storm / weather (weather code description).
+ALERT_RULES = [
+    ("RAIN", "rainfall_24h", operator.gt, [20, 50, 100], [
+        ("MODERATE_RAINFALL", "MODERATE", "Rainfall Advisory",
+         "Moderate rainfall of {rainfall_24h}mm in past 24 hours.",
+         "Stay alert. Monitor local water levels.", ANALYSIS_SOURCE),
+        ("HEAVY_RAINFALL", "HIGH", "Heavy Rainfall Alert",
+         "Heavy rainfall of {rainfall_24h}mm in past 24 hours. Flood risk elevated.",
+         "Avoid waterlogged areas. Keep emergency supplies ready.", ANALYSIS_SOURCE),
+        ("EXTREME_RAINFALL", "SEVERE", "Extreme Rainfall Warning",
+         "Extremely heavy rainfall of {rainfall_24h}mm recorded in past 24 hours. Flash flood risk is very high.",
+         "Evacuate low-lying areas immediately. Move to higher ground.", ANALYSIS_SOURCE),
+    ]),
+    ("SOIL", "soil_moisture", operator.gt, [0.8], [
+        ("SOIL_SATURATION", "HIGH", "Soil Saturation Warning",
+         "Soil moisture at {soil_percent:.0f}%. Ground cannot absorb more water — high runoff expected.",
+         "Risk of landslides in hilly areas. Avoid slopes.", ANALYSIS_SOURCE),
+    ]),
+    ("CUM", "rainfall_7d", operator.gt, [300], [
+        ("CUMULATIVE_RAINFALL", "SEVERE", "Prolonged Flooding Risk",
+         "Total {rainfall_7d}mm rainfall over 7 days. Rivers and reservoirs likely at capacity.",
+         "Be prepared for sustained flooding. Follow NDMA guidelines.", ANALYSIS_SOURCE),
+    ]),
+    ("STORM", "weather_code", operator.ge, [95], [
+        ("THUNDERSTORM", "HIGH", "Severe Thunderstorm",
+         "Active thunderstorm detected. {storm}.",
+         "Stay indoors. Avoid open areas and water bodies.", "Open-Meteo Weather"),
+    ]),
+]
+# Issued when no rule fires
+ALL_CLEAR = ("OK", ("ALL_CLEAR", "LOW", "No Active Warnings",
+                    "Current conditions normal. Rainfall: {rainfall_24h}mm/24h. Weather: {weather}.",
+                    "No action needed. Continue to monitor.", ANALYSIS_SOURCE))
+
+# Weather fields the rules and templates read (missing ones count as 0)
+ALERT_FIELDS = ("rainfall_24h", "rainfall_7d", "soil_moisture", "weather_code")
+_FIELD_INDEX = {name: i for i, name in enumerate(ALERT_FIELDS)}
+# Below this many locations the rules run as plain Python; NumPy's per-call overhead only pays off on batches
+VECTORIZE_MIN_BATCH = 20
+
+
+# Template fields, in the positional order compiled templates take them
+TEMPLATE_FIELDS = ("rainfall_24h", "rainfall_7d", "soil_percent", "storm", "weather")
+
+
+def _compile_template(template: str):
+    """'{rainfall_24h}mm' -> '{0}mm'.format: named fields resolved to positions once, at import."""
+    parts = []
+    for literal, name, spec, conversion in string.Formatter().parse(template):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if name is not None:
+            parts.append("{%d%s%s}" % (TEMPLATE_FIELDS.index(name), f"!{conversion}" if conversion else "",
+                                        f":{spec}" if spec else ""))
+    return "".join(parts).format
+
+
+def _compile(prefix: str, tier: tuple) -> tuple:
+    alert_type, severity, title, message, recommendation, source = tier
+    return prefix, alert_type, severity, title, _compile_template(message), recommendation, source
+
+
+# Rules with thresholds as arrays and compiled templates, built once at import
+_RULES = [
+    (_FIELD_INDEX[field], compare, thresholds, np.asarray(thresholds, dtype=np.float64),
+     [_compile(prefix, tier) for tier in tiers])
+    for prefix, field, compare, thresholds, tiers in ALERT_RULES
+]
+_ALL_CLEAR = _compile(*ALL_CLEAR)
+
+
+def _fired(row: list) -> list:
+    """Tiers fired for one location, in report order. A missing (None) value never fires."""
+    fired = []
+    for index, compare, thresholds, _, tiers in _RULES:
+        value = row[index]
+        if value is None:
+            continue
+        passed = 0
+        for threshold in thresholds:  # ascending, so the first one not passed ends it
+            if not compare(value, threshold):
+                break
+            passed += 1
+        if passed:
+            fired.append(tiers[passed - 1])
+    return fired
+
+
+def _fired_batch(rows: list) -> list:
+    """_fired() for every row, one NumPy comparison per rule."""
+    values = np.array(rows, dtype=np.float64).reshape(len(rows), len(ALERT_FIELDS))  # None -> NaN, never fires
+    fired = [[] for _ in rows]
+    for index, compare, _, thresholds, tiers in _RULES:
+        passed = compare(values[:, index, None], thresholds).sum(axis=1)
+        for row, count in zip(np.flatnonzero(passed).tolist(), passed[passed > 0].tolist()):
+            fired[row].append(tiers[count - 1])
+    return fired
+
+
 def interpret_weather_risk(weather_data: dict) -> List[dict]:
     """Generate risk alerts based on real weather data."""
-    alerts = []
-    rainfall_24h = weather_data.get("rainfall_24h", 0)
-    rainfall_7d = weather_data.get("rainfall_7d", 0)
-    soil_moisture = weather_data.get("soil_moisture", 0)
-    weather_code = weather_data.get("weather_code", 0)
-    lat = weather_data.get("lat", 0)
-    lon = weather_data.get("lon", 0)
-
-    # Heavy rainfall alert
-    if rainfall_24h > 100:
-        alerts.append({
-            "id": f"RAIN-{datetime.now().strftime('%Y%m%d%H')}",
-            "type": "EXTREME_RAINFALL",
-            "severity": "SEVERE",
-            "title": "Extreme Rainfall Warning",
-            "message": f"Extremely heavy rainfall of {rainfall_24h}mm recorded in past 24 hours. Flash flood risk is very high.",
-            "recommendation": "Evacuate low-lying areas immediately. Move to higher ground.",
-            "lat": lat, "lon": lon,
-            "source": "FloodSense AI Analysis",
-            "timestamp": datetime.now().isoformat(),
-        })
-    elif rainfall_24h > 50:
-        alerts.append({
-            "id": f"RAIN-{datetime.now().strftime('%Y%m%d%H')}",
-            "type": "HEAVY_RAINFALL",
-            "severity": "HIGH",
-            "title": "Heavy Rainfall Alert",
-            "message": f"Heavy rainfall of {rainfall_24h}mm in past 24 hours. Flood risk elevated.",
-            "recommendation": "Avoid waterlogged areas. Keep emergency supplies ready.",
-            "lat": lat, "lon": lon,
-            "source": "FloodSense AI Analysis",
-            "timestamp": datetime.now().isoformat(),
-        })
-    elif rainfall_24h > 20:
-        alerts.append({
-            "id": f"RAIN-{datetime.now().strftime('%Y%m%d%H')}",
-            "type": "MODERATE_RAINFALL",
-            "severity": "MODERATE",
-            "title": "Rainfall Advisory",
-            "message": f"Moderate rainfall of {rainfall_24h}mm in past 24 hours.",
-            "recommendation": "Stay alert. Monitor local water levels.",
-            "lat": lat, "lon": lon,
-            "source": "FloodSense AI Analysis",
-            "timestamp": datetime.now().isoformat(),
-        })
-
-    # Soil saturation alert
-    if soil_moisture > 0.8:
-        alerts.append({
-            "id": f"SOIL-{datetime.now().strftime('%Y%m%d%H')}",
-            "type": "SOIL_SATURATION",
-            "severity": "HIGH",
-            "title": "Soil Saturation Warning",
-            "message": f"Soil moisture at {soil_moisture*100:.0f}%. Ground cannot absorb more water — high runoff expected.",
-            "recommendation": "Risk of landslides in hilly areas. Avoid slopes.",
-            "lat": lat, "lon": lon,
-            "source": "FloodSense AI Analysis",
-            "timestamp": datetime.now().isoformat(),
-        })
-
-    # Cumulative rainfall alert
-    if rainfall_7d > 300:
-        alerts.append({
-            "id": f"CUM-{datetime.now().strftime('%Y%m%d%H')}",
-            "type": "CUMULATIVE_RAINFALL",
-            "severity": "SEVERE",
-            "title": "Prolonged Flooding Risk",
-            "message": f"Total {rainfall_7d}mm rainfall over 7 days. Rivers and reservoirs likely at capacity.",
-            "recommendation": "Be prepared for sustained flooding. Follow NDMA guidelines.",
-            "lat": lat, "lon": lon,
-            "source": "FloodSense AI Analysis",
-            "timestamp": datetime.now().isoformat(),
-        })
-
-    # Thunderstorm alert from weather code
-    if weather_code >= 95:
-        alerts.append({
-            "id": f"STORM-{datetime.now().strftime('%Y%m%d%H')}",
-            "type": "THUNDERSTORM",
-            "severity": "HIGH",
-            "title": "Severe Thunderstorm",
-            "message": f"Active thunderstorm detected. {WEATHER_CODES.get(weather_code, 'Severe weather')}.",
-            "recommendation": "Stay indoors. Avoid open areas and water bodies.",
-            "lat": lat, "lon": lon,
-            "source": "Open-Meteo Weather",
-            "timestamp": datetime.now().isoformat(),
-        })
-
-    # If no alerts, return an all-clear
-    if not alerts:
-        alerts.append({
-            "id": f"OK-{datetime.now().strftime('%Y%m%d%H')}",
-            "type": "ALL_CLEAR",
-            "severity": "LOW",
-            "title": "No Active Warnings",
-            "message": f"Current conditions normal. Rainfall: {rainfall_24h}mm/24h. Weather: {WEATHER_CODES.get(weather_code, 'Unknown')}.",
-            "recommendation": "No action needed. Continue to monitor.",
-            "lat": lat, "lon": lon,
-            "source": "FloodSense AI Analysis",
-            "timestamp": datetime.now().isoformat(),
-        })
+    return interpret_weather_risk_batch([weather_data])[0]
+
 
+def interpret_weather_risk_batch(weathers: list, locations: list = None, now: datetime = None) -> List[List[dict]]:
+    """
+    Alerts for many locations at once: every rule is evaluated over the whole batch in one
+    vectorized comparison, and all alerts share one timestamp. `weathers` are records (or
+    WeatherSnapshots); `locations` are (lat, lon) pairs, taken from the records if omitted.
+    """
+    now = now or datetime.now()
+    timestamp = now.isoformat()
+    stamp = timestamp[0:4] + timestamp[5:7] + timestamp[8:10] + timestamp[11:13]  # %Y%m%d%H, without strftime
+    rows = [[weather.get(name, 0) for name in ALERT_FIELDS] for weather in weathers]
+    if locations is None:
+        locations = [(weather.get("lat", 0), weather.get("lon", 0)) for weather in weathers]
+    fired = _fired_batch(rows) if len(rows) >= VECTORIZE_MIN_BATCH else [_fired(row) for row in rows]
+
+    alerts = []
+    for row, tiers, (lat, lon) in zip(rows, fired, locations):
+        rainfall_24h, rainfall_7d, soil_moisture, weather_code = row
+        fields = (  # TEMPLATE_FIELDS order
+            rainfall_24h,
+            rainfall_7d,
+            soil_moisture * 100 if soil_moisture is not None else None,
+            WEATHER_CODES.get(weather_code, "Severe weather"),
+            WEATHER_CODES.get(weather_code, "Unknown"),
+        )
+        alerts.append([
+            {
+                "id": f"{prefix}-{stamp}",
+                "type": alert_type,
+                "severity": severity,
+                "title": title,
+                "message": message(*fields),
+                "recommendation": recommendation,
+                "lat": lat, "lon": lon,
+                "source": source,
+                "timestamp": timestamp,
+            }
+            for prefix, alert_type, severity, title, message, recommendation, source in tiers or [_ALL_CLEAR]
+        ])
     return alerts
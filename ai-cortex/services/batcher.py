@@ -0,0 +1,83 @@
+"""
+Batch Fetcher — coalesces concurrent single-point requests into one
+multi-location Open-Meteo call and splits the response back out.
+"""
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class BatchFetcher:
+    """Collects points for `window` seconds (or until `max_batch`) and fetches them together."""
+
+    def __init__(self, name: str, fetch_many, window: float, max_batch: int):
+        self.name = name
+        self.fetch_many = fetch_many    # async (points: list[(lat, lon)]) -> list[result]
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []              # [(lat, lon, future)]
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.points = 0
+
+    async def fetch(self, lat: float, lon: float):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((lat, lon, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list):
+        # Callers that gave up (timeout/cancel) while waiting are dropped from the batch
+        batch = [item for item in batch if not item[2].done()]
+        points = list(dict.fromkeys((lat, lon) for lat, lon, _ in batch))
+        if not points:
+            return
+        self.batches += 1
+        self.points += len(points)
+        error = RuntimeError(f"{self.name}: batch fetch aborted")
+        try:
+            fetched = await self.fetch_many(points)
+            if len(fetched) != len(points):
+                raise RuntimeError(f"{self.name}: upstream returned {len(fetched)} results for {len(points)} points")
+            results = dict(zip(points, fetched))
+            for lat, lon, future in batch:
+                result = results.get((lat, lon), _MISSING)
+                if future.done():
+                    continue
+                if result is _MISSING:
+                    future.set_exception(RuntimeError(f"{self.name}: no result for ({lat}, {lon})"))
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            error = e
+        finally:
+            # Whatever happened (cancellation included), no caller is left waiting on its future
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "points": self.points,
+            "avg_batch_size": round(self.points / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,151 @@
+"""
+Weather Cache — bounded LRU cache keyed by grid-snapped coordinates.
+Entries expire at the next upstream model run and are served stale
+while a background refresh fetches the new run. An optional shared
+DiskCache sits behind it as a second level.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def grid_key(lat: float, lon: float, resolution: float) -> tuple:
+    """Snap coordinates to the centre of the provider's grid cell."""
+    return (
+        round(round(lat / resolution) * resolution, 4),
+        round(round(lon / resolution) * resolution, 4),
+    )
+
+
+class TTLCache:
+    """LRU cache whose entries expire on model-run boundaries."""
+
+    def __init__(self, name: str, max_size: int, cadence: float, publish_lag: float, stale_ttl: float,
+                 store=None, record_type=None):
+        self.name = name
+        self.max_size = max_size
+        self.cadence = cadence          # seconds between upstream model runs
+        self.publish_lag = publish_lag  # delay before a new run is available upstream
+        self.stale_ttl = stale_ttl      # how long past expiry an entry may still be served
+        self._entries = OrderedDict()   # key -> (value, expires_at)
+        self._refreshing = {}           # key -> background refresh task
+        self.store = store              # optional DiskCache (L2) shared across workers and restarts
+        self._writes = set()            # in-flight L2 writes
+        self.record_type = record_type  # value class with to_record()/from_record() for the store's JSON blobs
+        self.hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _expiry(self, now: float) -> float:
+        next_run = math.floor((now - self.publish_lag) / self.cadence + 1) * self.cadence
+        return next_run + self.publish_lag
+
+    def get(self, key):
+        """Return (value, is_fresh), or (None, False) if missing or too stale."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        value, expires_at = entry
+        now = time.time()
+        if now >= expires_at + self.stale_ttl:
+            del self._entries[key]
+            return None, False
+        self._entries.move_to_end(key)
+        return value, now < expires_at
+
+    def set(self, key, value, expires_at: float = None):
+        self._entries[key] = (value, expires_at or self._expiry(time.time()))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, key, fetch, fresh: bool = False):
+        """
+        Serve `key` from cache, calling `fetch()` on a miss or refreshing in the background when stale.
+        With fresh=True a stale entry is refetched before returning (and only served if that fails),
+        for callers that must see the latest model run.
+        """
+        value, is_fresh = self.get(key)
+        if value is None and self.store is not None:
+            value, is_fresh = await self._load_from_store(key)
+        if value is not None:
+            if is_fresh:
+                self.hits += 1
+            elif fresh:
+                return await self._refetch(key, fetch, value)
+            else:
+                self.stale_hits += 1
+                self._schedule_refresh(key, fetch)
+            return value
+
+        self.misses += 1
+        value = await fetch()
+        self._save(key, value)
+        return value
+
+    async def _refetch(self, key, fetch, stale):
+        self.misses += 1
+        try:
+            value = await fetch()
+        except Exception as e:
+            logger.warning(f"{self.name} fresh fetch failed for {key}, serving the stale entry: {e}")
+            self.stale_hits += 1
+            return stale
+        self._save(key, value)
+        return value
+
+    async def _load_from_store(self, key) -> tuple:
+        value, expires_at = await self.store.get(self.name, key)
+        if value is None:
+            return None, False
+        self.disk_hits += 1
+        if self.record_type is not None:
+            value = self.record_type.from_record(value)
+        self.set(key, value, expires_at)
+        return value, time.time() < expires_at
+
+    def _save(self, key, value):
+        """Set in memory, and write through to the disk store in the background."""
+        self.set(key, value)
+        if self.store is None:
+            return
+        expires_at = self._entries[key][1]
+        run = int(expires_at - self.publish_lag - self.cadence)
+        record = value.to_record() if self.record_type is not None else value
+        task = asyncio.create_task(
+            self.store.set(self.name, key, record, run, expires_at, expires_at + self.stale_ttl)
+        )
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    def _schedule_refresh(self, key, fetch):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                self._save(key, await fetch())
+            except Exception as e:
+                logger.warning(f"{self.name} cache refresh failed for {key}: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "refreshing": len(self._refreshing),
+        }
@@ -0,0 +1,134 @@
+"""
+Disk Cache — persistent SQLite (WAL) store behind the in-memory TTLCache.
+Every uvicorn worker opens the same file, so a cell fetched by one worker is
+a hit for the others, and a restarted fleet starts warm. Rows are keyed by
+cache name, grid cell and upstream model run, hold the parsed record as
+compressed JSON, and are pruned once they're too old to be served even stale.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    cache        TEXT    NOT NULL,
+    lat          REAL    NOT NULL,
+    lon          REAL    NOT NULL,
+    run          INTEGER NOT NULL,   -- upstream model run (epoch seconds) the value came from
+    expires_at   REAL    NOT NULL,
+    usable_until REAL    NOT NULL,   -- expires_at + stale window; pruned after this
+    value        BLOB    NOT NULL,
+    PRIMARY KEY (cache, lat, lon, run)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_usable_until ON entries (usable_until);
+"""
+
+
+def encode(value: dict) -> bytes:
+    return zlib.compress(orjson.dumps(value), 1)
+
+
+def decode(blob: bytes) -> dict:
+    return orjson.loads(zlib.decompress(blob))
+
+
+class DiskCache:
+    """One connection per process, used from worker threads so SQLite I/O never blocks the event loop."""
+
+    def __init__(self, path: str, prune_interval: float = 600.0, busy_timeout: float = 5.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self.busy_timeout = busy_timeout
+        self._conn = None
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+        self.pruned = 0
+        self.errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False,
+                                   isolation_level=None)
+            # WAL lets every worker read while one writes; NORMAL sync is safe in WAL mode
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            logger.info(f"Opened disk cache {self.path}")
+        return self._conn
+
+    def _get(self, cache: str, key: tuple):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM entries WHERE cache = ? AND lat = ? AND lon = ? "
+                "AND usable_until > ? ORDER BY run DESC LIMIT 1",
+                (cache, key[0], key[1], time.time()),
+            ).fetchone()
+        return (decode(row[0]), row[1]) if row else (None, None)
+
+    def _set(self, cache: str, key: tuple, value: dict, run: int, expires_at: float, usable_until: float):
+        blob = encode(value)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cache, key[0], key[1], run, expires_at, usable_until, blob),
+            )
+            # Older runs of the same cell are superseded
+            conn.execute("DELETE FROM entries WHERE cache = ? AND lat = ? AND lon = ? AND run < ?",
+                         (cache, key[0], key[1], run))
+            now = time.time()
+            if now - self._last_prune >= self.prune_interval:
+                self._last_prune = now
+                self.pruned += conn.execute("DELETE FROM entries WHERE usable_until <= ?", (now,)).rowcount
+
+    async def get(self, cache: str, key: tuple) -> tuple:
+        """(value, expires_at), or (None, None) on a miss or a disk error."""
+        self.reads += 1
+        try:
+            value, expires_at = await asyncio.to_thread(self._get, cache, key)
+        except (sqlite3.Error, ValueError, zlib.error) as e:
+            self.errors += 1
+            logger.warning(f"Disk cache read failed for {cache} {key}: {e}")
+            return None, None
+        if value is not None:
+            self.hits += 1
+        return value, expires_at
+
+    async def set(self, cache: str, key: tuple, value: dict, run: int, expires_at: float, usable_until: float):
+        try:
+            await asyncio.to_thread(self._set, cache, key, value, run, expires_at, usable_until)
+            self.writes += 1
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Disk cache write failed for {cache} {key}: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "size_bytes": sum(os.path.getsize(p) for p in (self.path, f"{self.path}-wal") if os.path.exists(p)),
+            "reads": self.reads,
+            "hits": self.hits,
+            "hit_ratio": round(self.hits / self.reads, 4) if self.reads else 0.0,
+            "writes": self.writes,
+            "pruned": self.pruned,
+            "errors": self.errors,
+        }
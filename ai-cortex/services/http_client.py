@@ -0,0 +1,136 @@
+"""
+HTTP Client Pool — one long-lived httpx.AsyncClient per upstream host.
+Reusing clients keeps TCP/TLS connections to Open-Meteo alive between calls.
+"""
+import asyncio
+import httpx
+import logging
+import orjson
+import os
+import time
+from urllib.parse import urlsplit
+
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15.0"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60.0"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+# Cap on concurrent upstream requests across all hosts, so fan-out can't flood Open-Meteo
+UPSTREAM_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", "32"))
+
+_upstream_slots = asyncio.Semaphore(UPSTREAM_CONCURRENCY)
+
+# host -> shared client / transport / request counters
+_clients = {}
+_transports = {}
+_counters = {}
+
+
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed. Using HTTP/1.1.")
+        return False
+
+
+def _create_client(host: str) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=_http2_available())
+    _transports[host] = transport
+    _counters[host] = {"requests": 0, "errors": 0, "in_flight": 0}
+    logger.info(f"Created pooled HTTP client for {host} (max_connections={HTTP_MAX_CONNECTIONS})")
+    return httpx.AsyncClient(transport=transport, timeout=HTTP_TIMEOUT)
+
+
+def get_client(url: str) -> httpx.AsyncClient:
+    """Return the shared client for the host of `url`, creating it on first use."""
+    host = urlsplit(url).netloc
+    client = _clients.get(host)
+    if client is None or client.is_closed:
+        client = _create_client(host)
+        _clients[host] = client
+    return client
+
+
+async def get_json(url: str, params: dict):
+    """GET `url` through the shared pool and return the JSON body, parsed straight from the bytes."""
+    host = urlsplit(url).netloc
+    client = get_client(url)
+    counters = _counters[host]
+    async with _upstream_slots:
+        counters["requests"] += 1
+        counters["in_flight"] += 1
+        started = time.perf_counter()
+        outcome = "cancelled"
+        try:
+            resp = await client.get(url, params=params)
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)
+            outcome = "ok"
+            return data
+        except Exception as e:
+            counters["errors"] += 1
+            outcome = _error_outcome(e)
+            raise
+        finally:
+            counters["in_flight"] -= 1
+            metrics.upstream_requests.inc(host, outcome)
+            metrics.upstream_duration.observe(time.perf_counter() - started, host)
+
+
+def _error_outcome(error: Exception) -> str:
+    """Low-cardinality label for an upstream failure."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "connection"
+    return "error"
+
+
+async def close_clients():
+    """Close every pooled client. Called from the app lifespan on shutdown."""
+    for host, client in list(_clients.items()):
+        await client.aclose()
+        logger.info(f"Closed pooled HTTP client for {host}")
+    _clients.clear()
+    _transports.clear()
+
+
+def pool_stats() -> dict:
+    """Connection-pool usage per upstream host, for sizing the limits above."""
+    hosts = {}
+    for host, transport in _transports.items():
+        pool = getattr(transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for c in connections if c.is_idle())
+        hosts[host] = {
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "http2": any("HTTP/2" in c.info() for c in connections),
+            **_counters.get(host, {}),
+        }
+    return {
+        "limits": {
+            "max_connections": HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+            "http2": HTTP2_ENABLED,
+            "upstream_concurrency": UPSTREAM_CONCURRENCY,
+        },
+        "hosts": hosts,
+    }
@@ -0,0 +1,31 @@
+"""
+Event Loop Monitor — measures how late the asyncio loop wakes up from a
+fixed sleep. Sustained lag means something is blocking the loop.
+"""
+import asyncio
+import os
+import time
+
+from services import metrics
+
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+
+_stats = {"samples": 0, "last_ms": 0.0, "max_ms": 0.0, "avg_ms": 0.0}
+
+
+async def run_lag_monitor():
+    """Sample event-loop lag every LOOP_LAG_INTERVAL seconds until cancelled."""
+    while True:
+        expected = time.perf_counter() + LOOP_LAG_INTERVAL
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+        metrics.event_loop_lag.observe(lag_ms / 1000)
+        _stats["samples"] += 1
+        _stats["last_ms"] = lag_ms
+        _stats["max_ms"] = max(_stats["max_ms"], lag_ms)
+        # Exponentially weighted so the average tracks recent load
+        _stats["avg_ms"] = lag_ms if _stats["samples"] == 1 else 0.9 * _stats["avg_ms"] + 0.1 * lag_ms
+
+
+def lag_stats() -> dict:
+    return {key: round(value, 3) if isinstance(value, float) else value for key, value in _stats.items()}
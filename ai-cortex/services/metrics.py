@@ -0,0 +1,170 @@
+"""
+Metrics — hand-rolled Prometheus counters and histograms, rendered in the
+text exposition format by /metrics. Recording is a dict lookup plus a bisect,
+so it is safe to call on every request; values that already live elsewhere
+(cache, batching, pool stats) are read by collectors only at scrape time.
+"""
+import time
+from bisect import bisect_left
+
+PREFIX = "floodsense_"
+
+# Seconds; spans cache hits (sub-ms) to slow upstream calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Rows per inference call; /predict is 1, /predict/bulk up to BULK_MAX_LOCATIONS
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2000)
+
+_metrics = []
+_collectors = []
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        _metrics.append(self)
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, count in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(count)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative buckets are only summed at render time; observe() bumps one slot."""
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        _metrics.append(self)
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def register_collector(fn):
+    """
+    `fn()` is called at scrape time and returns [(name, type, help, [(labels_dict, value), ...])],
+    for gauges and counters whose values are already tracked by another module.
+    """
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        for name, kind, help, samples in collect():
+            name = PREFIX + name
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ─── Shared metrics ───────────────────────────────────
+
+http_requests = Counter("http_requests_total", "HTTP requests by route, method and status.",
+                        ("route", "method", "status"))
+http_request_duration = Histogram("http_request_duration_seconds", "HTTP request latency by route.",
+                                   ("route", "method"))
+
+upstream_requests = Counter("upstream_requests_total", "Upstream (Open-Meteo) requests by host and outcome.",
+                            ("host", "outcome"))
+upstream_duration = Histogram("upstream_request_duration_seconds", "Upstream request latency by host.",
+                               ("host",))
+
+inference_duration = Histogram("inference_duration_seconds", "Model inference run time on the inference pool.")
+inference_wait = Histogram("inference_queue_wait_seconds", "Time inference calls waited for a pool thread.")
+inference_batch_size = Histogram("inference_batch_size", "Rows scored per inference call.",
+                                  buckets=BATCH_SIZE_BUCKETS)
+
+event_loop_lag = Histogram("event_loop_lag_seconds", "Event-loop wake-up lag per monitor sample.")
+
+
+def is_event_stream(headers: list) -> bool:
+    """True for an SSE response (by its ASGI headers): it stays open for minutes, so it isn't request latency."""
+    for name, value in headers:
+        if name == b"content-type":
+            return value.startswith(b"text/event-stream")
+    return False
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware overhead). Labels by route
+    template, not raw path, so query strings and path params can't explode cardinality.
+    Event streams are counted but kept out of the latency histogram.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = [500]
+        streaming = [False]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                streaming[0] = is_event_stream(message.get("headers", []))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(route, method, status[0])
+            if not streaming[0]:
+                http_request_duration.observe(time.perf_counter() - started, route, method)
@@ -0,0 +1,205 @@
+"""
+Push — Server-Sent Events subscriptions to district risk and alerts. Each risk
+snapshot refresh is diffed against the previous one, and subscribers get a
+message only for their districts whose risk level, score band or alert set
+changed. Alert IDs are kept for as long as an alert stays active, so clients
+can dedupe across refreshes and reconnects.
+"""
+import asyncio
+import logging
+import math
+import os
+import re
+from datetime import datetime
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Width of a risk_score (0-10) band; moving to another band is pushed, smaller moves are not
+PUSH_SCORE_BAND = float(os.getenv("PUSH_SCORE_BAND", "1.0"))
+# Idle streams get an SSE comment this often so proxies don't drop them (s)
+PUSH_KEEPALIVE = float(os.getenv("PUSH_KEEPALIVE", "15"))
+# Messages buffered per subscriber; a client that falls this far behind is disconnected and resyncs
+PUSH_QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", "64"))
+
+# Last published view of each district, by district_key()
+_state = {}
+_subscribers = set()
+_sequence = 0  # refreshes published, sent as the SSE event id
+_stats = {"refreshes": 0, "changes": 0, "messages": 0, "dropped": 0}
+
+
+class Subscriber:
+    """One open stream: which districts it follows, and its outgoing queue of encoded events."""
+
+    __slots__ = ("districts", "states", "boxes", "queue", "closed")
+
+    def __init__(self, districts: set, states: set, boxes: list):
+        self.districts = districts  # lower-case district names
+        self.states = states        # lower-case state names
+        self.boxes = boxes          # (min_lon, min_lat, max_lon, max_lat)
+        self.queue = asyncio.Queue(PUSH_QUEUE_SIZE)
+        self.closed = False
+
+    def matches(self, view: dict) -> bool:
+        if not (self.districts or self.states or self.boxes):
+            return True
+        if (view["district"] or "").lower() in self.districts or (view["state"] or "").lower() in self.states:
+            return True
+        return any(min_lon <= view["lon"] <= max_lon and min_lat <= view["lat"] <= max_lat
+                   for min_lon, min_lat, max_lon, max_lat in self.boxes)
+
+    def push(self, event: bytes):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            _stats["dropped"] += 1
+            self.close()
+
+    def close(self):
+        """End the stream after what's already queued (a full queue is cleared first)."""
+        if self.closed:
+            return
+        self.closed = True
+        _subscribers.discard(self)
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+def parse_bbox(value: str) -> tuple:
+    """'min_lon,min_lat,max_lon,max_lat' -> floats; ValueError if malformed."""
+    box = tuple(float(part) for part in value.split(","))
+    if len(box) != 4 or box[0] > box[2] or box[1] > box[3]:
+        raise ValueError(f"bbox must be min_lon,min_lat,max_lon,max_lat: {value!r}")
+    return box
+
+
+def district_key(entry: dict) -> str:
+    """'ASSAM-KAMRUP': stable per district, also the suffix of its alert IDs."""
+    name = f"{entry.get('state')}-{entry['district']}" if entry.get("district") else f"{entry['lat']}N-{entry['lon']}E"
+    return re.sub(r"[^A-Z0-9]+", "-", name.upper()).strip("-")
+
+
+def score_band(risk_score: float) -> int:
+    return math.floor(risk_score / PUSH_SCORE_BAND)
+
+
+def _view(entry: dict, alerts: list, previous: dict) -> dict:
+    """Client-facing state of one district; alerts that were already active keep their ID."""
+    key = district_key(entry)
+    active = {alert["type"]: alert["id"] for alert in previous["alerts"]} if previous else {}
+    return {
+        "key": key,
+        "district": entry.get("district"),
+        "state": entry.get("state"),
+        "lat": entry["lat"],
+        "lon": entry["lon"],
+        "risk_level": entry["risk_level"],
+        "risk_score": entry["risk_score"],
+        "probability": entry["probability"],
+        "score_band": score_band(entry["risk_score"]),
+        "alerts": [
+            {**alert, "id": active.get(alert["type"]) or f"{alert['id']}-{key}"}
+            for alert in alerts if alert["type"] != "ALL_CLEAR"
+        ],
+    }
+
+
+def _diff(previous: dict, view: dict):
+    """Update message for a district, or None when nothing clients act on changed."""
+    if previous is None:
+        changed = ["risk_level", "score_band", "alerts"]
+        added, removed = view["alerts"], []
+    else:
+        before = {alert["id"] for alert in previous["alerts"]}
+        after = {alert["id"] for alert in view["alerts"]}
+        added = [alert for alert in view["alerts"] if alert["id"] not in before]
+        removed = sorted(before - after)
+        changed = [name for name in ("risk_level", "score_band") if previous[name] != view[name]]
+        if added or removed:
+            changed.append("alerts")
+        if not changed:
+            return None
+    return {
+        **{name: view[name] for name in ("key", "district", "state", "lat", "lon", "risk_level", "risk_score",
+                                         "probability", "score_band")},
+        "changed": changed,
+        "alerts_added": added,
+        "alerts_removed": removed,
+        "alert_ids": [alert["id"] for alert in view["alerts"]],
+    }
+
+
+def _event(name: str, data: dict, event_id: int = None) -> bytes:
+    head = f"event: {name}\n" + (f"id: {event_id}\n" if event_id is not None else "")
+    return head.encode() + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+def publish(results: list, alerts: list) -> int:
+    """
+    Diff one refresh against the last and push the changes. results[i] is a risk snapshot
+    entry and alerts[i] its interpret_weather_risk output; failed districts keep their last state.
+    Returns the number of districts that changed.
+    """
+    global _sequence
+    changes = []
+    for entry, district_alerts in zip(results, alerts):
+        if "error" in entry:
+            continue
+        key = district_key(entry)
+        previous = _state.get(key)
+        view = _view(entry, district_alerts, previous)
+        _state[key] = view
+        change = _diff(previous, view)
+        if change is not None:
+            changes.append(change)
+
+    _sequence += 1
+    _stats["refreshes"] += 1
+    _stats["changes"] += len(changes)
+    if changes:
+        generated_at = datetime.now().isoformat()
+        for subscriber in list(_subscribers):
+            matching = [change for change in changes if subscriber.matches(change)]
+            if matching:
+                _stats["messages"] += 1
+                subscriber.push(_event("update", {"generated_at": generated_at, "changes": matching}, _sequence))
+    logger.info(f"Push: {len(changes)} districts changed, {len(_subscribers)} subscribers")
+    return len(changes)
+
+
+async def stream(districts: set = frozenset(), states: set = frozenset(), boxes: list = ()):
+    """
+    SSE body: the current state of the matching districts, then updates as refreshes change them.
+    The subscriber only exists while the body is being iterated, so a response that never starts leaks nothing.
+    """
+    subscriber = Subscriber({d.lower() for d in districts}, {s.lower() for s in states}, list(boxes))
+    _subscribers.add(subscriber)
+    try:
+        yield _event("snapshot", {
+            "districts": [view for view in _state.values() if subscriber.matches(view)],
+        }, _sequence)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), PUSH_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                break
+            yield event
+    finally:
+        subscriber.close()
+
+
+def close_all():
+    """End every open stream (on shutdown)."""
+    for subscriber in list(_subscribers):
+        subscriber.close()
+
+
+def push_stats() -> dict:
+    return {"subscribers": len(_subscribers), "districts": len(_state), **_stats}
@@ -0,0 +1,65 @@
+"""
+Responses — orjson rendering for the hot endpoints, and the `fields` / `compact`
+projections that trim what a client (the map) doesn't read. Endpoints return
+FastJSONResponse directly, so FastAPI's jsonable_encoder pass is skipped too.
+"""
+from typing import Optional
+
+import orjson
+from fastapi import Response
+
+# Heavy arrays and per-row debug data dropped by ?compact=true
+COMPACT_DROPPED = frozenset({"daily_precipitation", "daily_dates", "discharge_trend", "dates", "features_used"})
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[dict]:
+    """
+    'risk.risk_level,weather' -> {'risk': {'risk_level': None}, 'weather': None}, where None
+    keeps the whole value. No fields means keep everything.
+    """
+    if not fields:
+        return None
+    tree = {}
+    for path in fields.split(","):
+        names = [name.strip() for name in path.split(".")]
+        if not all(names):
+            continue
+        node = tree
+        for name in names[:-1]:
+            if name in node and node[name] is None:  # already kept whole
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[names[-1]] = None
+    return tree or None
+
+
+def select(value, tree: Optional[dict]):
+    """Keep only the paths in `tree`; unknown names are ignored."""
+    if tree is None or not isinstance(value, dict):
+        return value
+    return {name: value[name] if sub is None else select(value[name], sub) for name, sub in tree.items()
+            if name in value}
+
+
+def compacted(value: dict, depth: int = 2) -> dict:
+    """Drop COMPACT_DROPPED keys and null values from a record and the records nested directly in it."""
+    return {
+        k: compacted(v, depth - 1) if depth > 1 and isinstance(v, dict) else v
+        for k, v in value.items() if v is not None and k not in COMPACT_DROPPED
+    }
+
+
+def shape(value: dict, fields: Optional[dict], compact: bool, keep: tuple = ()) -> dict:
+    """Apply ?fields then ?compact to one record; keys in `keep` (status, error) always survive."""
+    if fields is not None:
+        selected = select(value, fields)
+        value = {**{k: value[k] for k in keep if k in value and k not in selected}, **selected} if keep else selected
+    return compacted(value) if compact else value
@@ -0,0 +1,143 @@
+"""
+Risk Snapshot — refreshes flood risk for a fixed list of districts in the
+background and publishes it as one pre-serialized, ETag-tagged snapshot.
+Each refresh also feeds the push subscriptions (services/push.py).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from ml.executor import run_inference
+from ml.model import predict_risk_features
+from services import push
+from services.alert_service import interpret_weather_risk_batch
+from services.snapshots import feature_matrix
+from services.weather_service import get_location_data
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "true").lower() in ("1", "true", "yes")
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "3600"))
+SNAPSHOT_LOCATION_TIMEOUT = float(os.getenv("SNAPSHOT_LOCATION_TIMEOUT", "60"))
+SNAPSHOT_DISTRICTS_FILE = os.getenv(
+    "SNAPSHOT_DISTRICTS_FILE",
+    os.path.join(os.path.dirname(__file__), "..", "data", "districts.json"),
+)
+
+
+class Snapshot:
+    """Immutable published snapshot: response body bytes plus their ETag."""
+    __slots__ = ("generated_at", "etag", "body", "count")
+
+    def __init__(self, generated_at: str, etag: str, body: bytes, count: int):
+        self.generated_at = generated_at
+        self.etag = etag
+        self.body = body
+        self.count = count
+
+
+# Replaced wholesale on each refresh, so readers always see one complete snapshot
+_current = None
+_districts = None
+
+
+def current_snapshot():
+    return _current
+
+
+def load_districts(path: str = SNAPSHOT_DISTRICTS_FILE) -> list:
+    """Districts to track: [{"state", "district", "lat", "lon"}]."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def tracked_districts() -> list:
+    """load_districts(), read once and shared (also by /alerts/bulk)."""
+    global _districts
+    if _districts is None:
+        _districts = load_districts()
+    return _districts
+
+
+async def compute_results(districts: list) -> tuple:
+    """
+    Fetch every district concurrently (batched upstream), score them in one model call and
+    evaluate their alerts in one batch. Returns (results, alerts), alerts[i] being [] on failure.
+    """
+    fetched = await asyncio.gather(
+        # fresh: each tick lands just after the cache entries expire; serving them stale would publish the previous run
+        *(get_location_data(d["lat"], d["lon"], SNAPSHOT_LOCATION_TIMEOUT, fresh=True) for d in districts),
+        return_exceptions=True,
+    )
+    ok = [i for i, item in enumerate(fetched) if not isinstance(item, BaseException)]
+    features = feature_matrix([fetched[i][0] for i in ok], [fetched[i][1] for i in ok])
+    risks = await run_inference(predict_risk_features, features, rows=len(ok))
+    risk_by_index = dict(zip(ok, risks))
+    alerts = interpret_weather_risk_batch(
+        [fetched[i][0] for i in ok], [(districts[i]["lat"], districts[i]["lon"]) for i in ok],
+    )
+    alerts_by_index = dict(zip(ok, alerts))
+
+    results = []
+    for i, district in enumerate(districts):
+        entry = {
+            "lat": district["lat"],
+            "lon": district["lon"],
+            "district": district.get("district"),
+            "state": district.get("state"),
+        }
+        if i in risk_by_index:
+            weather, risk = fetched[i][0], risk_by_index[i]
+            entry.update({
+                "risk_level": risk["risk_level"],
+                "risk_score": risk["risk_score"],
+                "probability": risk["probability"],
+                "rainfall_24h": weather["rainfall_24h"],
+            })
+        else:
+            entry["error"] = str(fetched[i]) or type(fetched[i]).__name__
+        results.append(entry)
+    return results, [alerts_by_index.get(i, []) for i in range(len(districts))]
+
+
+def publish(results: list) -> Snapshot:
+    """Swap in a new snapshot unless the results are unchanged since the last one."""
+    global _current
+    digest = hashlib.sha1(json.dumps(results, sort_keys=True).encode()).hexdigest()
+    etag = f'"{digest[:16]}"'
+    if _current is not None and _current.etag == etag:
+        return _current
+
+    generated_at = datetime.now().isoformat()
+    body = json.dumps({
+        "status": "success",
+        "generated_at": generated_at,
+        "count": len(results),
+        "results": results,
+    }).encode()
+    _current = Snapshot(generated_at, etag, body, len(results))
+    return _current
+
+
+async def refresh_snapshot(districts: list) -> Snapshot:
+    results, alerts = await compute_results(districts)
+    snapshot = publish(results)
+    push.publish(results, alerts)
+    failed = sum(1 for r in results if "error" in r)
+    logger.info(f"Risk snapshot refreshed: {len(results)} districts, {failed} failed, etag={snapshot.etag}")
+    return snapshot
+
+
+async def run_scheduler():
+    """Refresh the snapshot every SNAPSHOT_INTERVAL seconds until cancelled."""
+    districts = tracked_districts()
+    logger.info(f"Risk snapshot scheduler started for {len(districts)} districts every {SNAPSHOT_INTERVAL:g}s")
+    while True:
+        try:
+            await refresh_snapshot(districts)
+        except Exception as e:
+            logger.error(f"Risk snapshot refresh failed: {e}", exc_info=True)
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
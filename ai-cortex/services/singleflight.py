@@ -0,0 +1,36 @@
+"""
+Single-Flight — concurrent callers asking for the same key share one
+in-flight upstream fetch instead of each making their own request.
+"""
+import asyncio
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key; all waiters get the same result or exception."""
+
+    def __init__(self):
+        self._calls = {}   # key -> in-flight task
+        self.leaders = 0   # calls that actually went upstream
+        self.shared = 0    # calls that joined an existing flight
+
+    async def do(self, key, fn):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.leaders += 1
+        else:
+            self.shared += 1
+        # Shielded so one waiter timing out or disconnecting doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def _done(self, key, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved even if every waiter has already gone away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "shared": self.shared}
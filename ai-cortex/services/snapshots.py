@@ -0,0 +1,229 @@
+"""
+Snapshots — the compact parsed records the weather and discharge caches hold.
+Scalar fields share one float64 row, series are float32 arrays with NaN for
+missing values, and dates are a first day number plus the series length.
+as_dict() renders the API record; feature_matrix() stacks the model inputs of
+many locations in one operation.
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+
+from ml.model import FEATURE_NAMES
+from services.timeseries import day_number, iso_dates, iso_hours
+
+# Scalar fields in API record order
+WEATHER_FIELDS = ("temperature", "humidity", "current_precipitation", "current_rain", "wind_speed", "weather_code",
+                  "rainfall_24h", "rainfall_7d", "soil_moisture")
+DISCHARGE_FIELDS = ("current_discharge", "max_discharge_7d", "avg_discharge_7d")
+# Upstream reports these as integers
+INTEGER_FIELDS = frozenset({"humidity", "weather_code"})
+
+_WEATHER_INDEX = {name: i for i, name in enumerate(WEATHER_FIELDS)}
+_DISCHARGE_INDEX = {name: i for i, name in enumerate(DISCHARGE_FIELDS)}
+# Snapshot field behind each model feature, in FEATURE_NAMES order (as compute_feature_matrix reads them)
+FEATURE_FIELDS = ("rainfall_24h", "rainfall_7d", "soil_moisture", "current_discharge", "max_discharge_7d",
+                  "avg_discharge_7d", "humidity", "temperature", "wind_speed", "weather_code")
+# Feature columns filled from each snapshot type, and the snapshot values they come from
+_WEATHER_COLUMNS = [c for c, name in enumerate(FEATURE_FIELDS) if name in _WEATHER_INDEX]
+_WEATHER_SOURCES = [_WEATHER_INDEX[FEATURE_FIELDS[c]] for c in _WEATHER_COLUMNS]
+_DISCHARGE_COLUMNS = [c for c, name in enumerate(FEATURE_FIELDS) if name in _DISCHARGE_INDEX]
+_DISCHARGE_SOURCES = [_DISCHARGE_INDEX[FEATURE_FIELDS[c]] for c in _DISCHARGE_COLUMNS]
+# Rows of WeatherSnapshot.horizon
+HORIZON_FIELDS = ("rainfall_24h", "rainfall_7d", "soil_moisture")
+_HORIZON_COLUMNS = [FEATURE_FIELDS.index(name) for name in HORIZON_FIELDS]
+_DISCHARGE_WINDOW = 7  # days behind each hour's max/avg discharge
+NO_HORIZON = np.empty((len(HORIZON_FIELDS), 0), dtype=np.float32)
+
+
+def _scalar(name: str, value: float):
+    if value != value:
+        return None
+    if name in INTEGER_FIELDS and value.is_integer():
+        return int(value)
+    return value
+
+
+def _series_list(values: np.ndarray, decimals: int) -> list:
+    """float32 -> the upstream's decimal values, NaN -> None."""
+    rounded = np.round(values.astype(np.float64), decimals).tolist()
+    return [None if v != v else v for v in rounded]
+
+
+def _row(record: dict, fields: tuple) -> np.ndarray:
+    return np.array([record.get(name, 0) for name in fields], dtype=np.float64)
+
+
+class WeatherSnapshot:
+    """One grid cell's parsed forecast."""
+
+    __slots__ = ("values", "daily_precipitation", "first_day", "horizon", "horizon_start", "fetched_at")
+
+    def __init__(self, values: np.ndarray, daily_precipitation: np.ndarray, first_day: int,
+                 horizon: np.ndarray = NO_HORIZON, horizon_start: int = 0, fetched_at: float = None):
+        self.values = values                            # float64, WEATHER_FIELDS order
+        self.daily_precipitation = daily_precipitation  # float32, one per day from first_day
+        self.first_day = first_day                      # day number of daily_precipitation[0]
+        self.horizon = horizon                          # float32 HORIZON_FIELDS × forecast hours
+        self.horizon_start = horizon_start              # local hour number of horizon[:, 0] (the current hour)
+        self.fetched_at = fetched_at or time.time()
+
+    @classmethod
+    def build(cls, current: dict, rainfall_24h: float, rainfall_7d: float, soil_moisture: float,
+              daily_precipitation: np.ndarray, first_day: int, horizon: tuple = None) -> "WeatherSnapshot":
+        """`horizon` is (first hour, array) from rolling_horizon(), if the response had a current time."""
+        values = np.array([
+            current.get("temperature_2m", 0),
+            current.get("relative_humidity_2m", 0),
+            current.get("precipitation", 0),
+            current.get("rain", 0),
+            current.get("wind_speed_10m", 0),
+            current.get("weather_code", 0),
+            round(rainfall_24h, 1),
+            round(rainfall_7d, 1),
+            round(soil_moisture, 4),
+        ], dtype=np.float64)
+        horizon_start, horizon = horizon or (0, NO_HORIZON)
+        return cls(values, daily_precipitation, first_day, horizon, horizon_start)
+
+    def __getitem__(self, name: str):
+        return _scalar(name, float(self.values[_WEATHER_INDEX[name]]))
+
+    def get(self, name: str, default=None):
+        return self[name] if name in _WEATHER_INDEX else default
+
+    def as_dict(self, lat: float, lon: float) -> dict:
+        record = {"lat": lat, "lon": lon}
+        record.update(zip(WEATHER_FIELDS, map(_scalar, WEATHER_FIELDS, self.values.tolist())))
+        record["daily_precipitation"] = _series_list(self.daily_precipitation, 1)
+        record["daily_dates"] = iso_dates(self.first_day, len(self.daily_precipitation))
+        record["source"] = "Open-Meteo"
+        record["timestamp"] = datetime.fromtimestamp(self.fetched_at).isoformat()
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict) -> "WeatherSnapshot":
+        """Inverse of to_record(), for records read back from the disk cache."""
+        dates = record.get("daily_dates") or []
+        horizon = record.get("horizon") or {}
+        return cls(
+            _row(record, WEATHER_FIELDS),
+            np.array(record.get("daily_precipitation") or [], dtype=np.float64).astype(np.float32),
+            day_number(dates[0]) if dates else 0,
+            np.array(horizon["values"], dtype=np.float32).reshape(len(HORIZON_FIELDS), -1) if horizon else NO_HORIZON,
+            horizon.get("start", 0),
+            datetime.fromisoformat(record["timestamp"]).timestamp() if record.get("timestamp") else None,
+        )
+
+    def to_record(self) -> dict:
+        """as_dict() without the location, plus the horizon."""
+        record = self.as_dict(None, None)
+        del record["lat"], record["lon"]
+        record["horizon"] = {"start": self.horizon_start, "values": self.horizon.tolist()}
+        return record
+
+
+class DischargeSnapshot:
+    """One grid cell's parsed river discharge, or a placeholder when the flood API failed."""
+
+    __slots__ = ("values", "trend", "first_day", "error")
+
+    def __init__(self, values: np.ndarray, trend: np.ndarray, first_day: int, error: str = None):
+        self.values = values          # float64, DISCHARGE_FIELDS order
+        self.trend = trend            # float32 daily discharge, one per day from first_day
+        self.first_day = first_day
+        self.error = error
+
+    @classmethod
+    def build(cls, discharges: np.ndarray, first_day: int) -> "DischargeSnapshot":
+        """From daily values (NaN = missing), with nan-aware aggregates; float32 is rounded back to 2 decimals."""
+        if discharges.dtype == np.float32:
+            discharges = np.round(discharges.astype(np.float64), 2)
+        valid = discharges[~np.isnan(discharges)].tolist()
+        if valid:
+            values = np.array([valid[-1], max(valid), round(sum(valid) / len(valid), 2)])
+        else:
+            values = np.zeros(len(DISCHARGE_FIELDS))
+        return cls(values, discharges.astype(np.float32), first_day)
+
+    @classmethod
+    def unavailable(cls, error: str) -> "DischargeSnapshot":
+        return cls(np.zeros(len(DISCHARGE_FIELDS)), np.empty(0, dtype=np.float32), 0, error)
+
+    def __getitem__(self, name: str):
+        return _scalar(name, float(self.values[_DISCHARGE_INDEX[name]]))
+
+    def as_dict(self, lat: float, lon: float) -> dict:
+        record = {"lat": lat, "lon": lon}
+        record.update(zip(DISCHARGE_FIELDS, self.values.tolist()))
+        record["discharge_trend"] = _series_list(self.trend, 2)
+        record["dates"] = iso_dates(self.first_day, len(self.trend))
+        if self.error is None:
+            record["source"] = "Open-Meteo Flood API"
+        else:
+            record["source"] = "unavailable"
+            record["error"] = self.error
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict) -> "DischargeSnapshot":
+        dates = record.get("dates") or []
+        return cls(
+            _row(record, DISCHARGE_FIELDS),
+            np.array(record.get("discharge_trend") or [], dtype=np.float64).astype(np.float32),
+            day_number(dates[0]) if dates else 0,
+            record.get("error"),
+        )
+
+    def to_record(self) -> dict:
+        record = self.as_dict(None, None)
+        del record["lat"], record["lon"]
+        return record
+
+
+def feature_matrix(weathers: list, discharges: list) -> np.ndarray:
+    """N×10 model inputs (FEATURE_NAMES order) for N snapshot pairs; matches compute_feature_matrix on as_dict()."""
+    features = np.empty((len(weathers), len(FEATURE_NAMES)))
+    if len(weathers):
+        features[:, _WEATHER_COLUMNS] = np.stack([w.values for w in weathers])[:, _WEATHER_SOURCES]
+        features[:, _DISCHARGE_COLUMNS] = np.stack([d.values for d in discharges])[:, _DISCHARGE_SOURCES]
+    return features
+
+
+def horizon_features(weather: WeatherSnapshot, discharge: DischargeSnapshot) -> tuple:
+    """
+    (timestamps, H×10 model inputs) for each forecast hour from now on. Rain and soil moisture are
+    rolling per hour; discharge is that day's value with max/avg over the 7 days ending on it;
+    humidity, temperature, wind and weather code stay at the current conditions (not fetched hourly).
+    Row 0 (the current hour) is the feature_matrix() row /predict scores, so both agree on "now".
+    """
+    hours = weather.horizon.shape[1]
+    features = np.empty((hours, len(FEATURE_NAMES)))
+    features[:, _WEATHER_COLUMNS] = weather.values[_WEATHER_SOURCES]
+    features[:, _HORIZON_COLUMNS] = weather.horizon.T
+    features[:, :2] = np.round(features[:, :2], 1)
+    features[:, 2] = np.round(features[:, 2], 4)
+
+    trend = np.round(discharge.trend.astype(np.float64), 2)
+    if not hours or not trend.size:
+        features[:, _DISCHARGE_COLUMNS] = 0.0
+        if hours:
+            features[0] = feature_matrix([weather], [discharge])[0]
+        return iso_hours(weather.horizon_start, hours), features
+    # Trailing window of each day, NaN-padded in front
+    windows = np.lib.stride_tricks.sliding_window_view(
+        np.concatenate((np.full(_DISCHARGE_WINDOW - 1, np.nan), trend)), _DISCHARGE_WINDOW)
+    valid = ~np.isnan(windows)
+    counts = valid.sum(axis=1)
+    last = _DISCHARGE_WINDOW - 1 - np.argmax(valid[:, ::-1], axis=1)
+    per_day = np.zeros((len(trend), len(DISCHARGE_FIELDS)))
+    has = counts > 0
+    per_day[has, 0] = windows[has, last[has]]
+    per_day[has, 1] = np.where(valid, windows, -np.inf).max(axis=1)[has]
+    per_day[has, 2] = np.round(np.where(valid, windows, 0.0).sum(axis=1)[has] / counts[has], 2)
+
+    days = (weather.horizon_start + np.arange(hours)) // 24 - discharge.first_day
+    features[:, _DISCHARGE_COLUMNS] = per_day[np.clip(days, 0, len(trend) - 1)][:, _DISCHARGE_SOURCES]
+    features[0] = feature_matrix([weather], [discharge])[0]
+    return iso_hours(weather.horizon_start, hours), features
@@ -0,0 +1,235 @@
+"""
+Rolling Series — per-cell ring buffers of the upstream time series, so a refresh
+only fetches the hours (or days) since the previous fetch and merges them in.
+Values are float32 with NaN for missing. Rain totals are kept per local day and
+adjusted by the delta of every merged or evicted hour, so the 24h/7d aggregates
+never re-sum the whole window.
+"""
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+HOUR = timedelta(hours=1)
+# 7 past days + 3 forecast days, plus a spare day so the oldest day needed is never partially evicted
+WINDOW_HOURS = 11 * 24
+# Local days a WINDOW_HOURS window can touch
+WINDOW_DAYS = WINDOW_HOURS // 24 + 1
+
+
+def hour_index(time: str) -> int:
+    """Hours since the epoch of an Open-Meteo local timestamp ('2026-10-17T05:15' -> its hour)."""
+    return (datetime.fromisoformat(time) - EPOCH) // HOUR
+
+
+def day_number(day: str) -> int:
+    """Days since the epoch of an ISO date; equals hour_index(...) // 24 for any hour of that day."""
+    return date.fromisoformat(day).toordinal() - EPOCH_ORDINAL
+
+
+def iso_dates(first_day: int, count: int) -> list:
+    return [date.fromordinal(EPOCH_ORDINAL + day).isoformat() for day in range(first_day, first_day + count)]
+
+
+def iso_hours(first_hour: int, count: int) -> list:
+    """Open-Meteo style local timestamps ('2026-10-17T05:00') for hours first_hour.."""
+    first_day = first_hour // 24
+    days = iso_dates(first_day, (first_hour + count - 1) // 24 - first_day + 1) if count else []
+    return [f"{days[hour // 24 - first_day]}T{hour % 24:02d}:00" for hour in range(first_hour, first_hour + count)]
+
+
+def as_float32(values: list, n: int) -> np.ndarray:
+    """Float32 column of length n; None and missing trailing values become NaN."""
+    column = np.full(n, np.nan, dtype=np.float32)
+    if values:
+        column[:min(n, len(values))] = np.array(values[:n], dtype=np.float64)
+    return column
+
+
+def _zeroed(values: np.ndarray) -> np.ndarray:
+    """NaN -> 0 (cheaper than np.nan_to_num, which also clamps infinities)."""
+    return np.where(np.isnan(values), 0.0, values)
+
+
+def rolling_horizon(first: int, precipitation: np.ndarray, soil: np.ndarray, now_hour: int) -> tuple:
+    """
+    (first hour, float32 3×H) for the hours from now_hour to the end of a series starting at hour
+    `first`: rain over the 24 and 168 hours ending at each hour, and the latest soil moisture.
+    """
+    n = len(precipitation)
+    start = max(0, now_hour - first)
+    if start >= n:
+        return now_hour, np.empty((3, 0), dtype=np.float32)
+    totals = np.concatenate(([0.0], np.cumsum(_zeroed(precipitation.astype(np.float64)))))
+    ends = np.arange(start + 1, n + 1)
+    horizon = np.empty((3, n - start), dtype=np.float32)
+    horizon[0] = totals[ends] - totals[np.maximum(ends - 24, 0)]
+    horizon[1] = totals[ends] - totals[np.maximum(ends - 168, 0)]
+    # Forward-fill soil moisture over missing hours
+    latest = np.maximum.accumulate(np.where(np.isnan(soil), -1, np.arange(n)))[start:]
+    horizon[2] = np.where(latest >= 0, soil[latest], 0.0)
+    return first + start, horizon
+
+
+class DayRing:
+    """Float32 values for a run of consecutive days (day numbers), NaN where missing."""
+
+    __slots__ = ("values", "first", "last")
+
+    def __init__(self, capacity: int = WINDOW_DAYS):
+        self.values = np.full(capacity, np.nan, dtype=np.float32)
+        self.first = None
+        self.last = None
+
+    def merge(self, first: int, values: list, oldest: int):
+        """Write days first.. and drop days before `oldest`."""
+        n = len(values)
+        if not n:
+            return
+        capacity = len(self.values)
+        last = first + n - 1
+        if self.first is None:
+            self.first, self.last = first, first - 1
+        if last > self.last:  # days entering the window may hold an older day's value
+            entering = np.arange(max(self.last + 1, last - capacity + 1), last + 1)
+            self.values[entering % capacity] = np.nan
+            self.last = last
+        skip = max(0, self.last - capacity + 1 - first)
+        if skip < n:
+            self.values[np.arange(first + skip, last + 1) % capacity] = as_float32(values[skip:], n - skip)
+        self.first = max(min(self.first, first), self.last - capacity + 1, oldest)
+
+    def window(self, first: int, last: int) -> tuple:
+        """(first day, float32 copy) of the buffered days in [first, last]."""
+        if self.first is None:
+            return first, np.empty(0, dtype=np.float32)
+        first, last = max(first, self.first), min(last, self.last)
+        if last < first:
+            return first, np.empty(0, dtype=np.float32)
+        return first, self.values[np.arange(first, last + 1) % len(self.values)]
+
+
+class HourlySeries:
+    """
+    Hourly precipitation and soil moisture for one cell, indexed by local hour
+    in a fixed ring. Slots outside [first, last] always hold NaN.
+    """
+
+    __slots__ = ("precipitation", "soil", "first", "last", "day_rain", "daily", "now_hour", "utc_offset",
+                 "synced_at")
+
+    def __init__(self, capacity: int = WINDOW_HOURS):
+        self.precipitation = np.full(capacity, np.nan, dtype=np.float32)
+        self.soil = np.full(capacity, np.nan, dtype=np.float32)
+        self.first = None                   # oldest buffered hour (inclusive)
+        self.last = None                    # newest buffered hour (inclusive)
+        self.day_rain = np.zeros(WINDOW_DAYS)  # rain over each buffered day's hours, ring by day number
+        self.daily = DayRing()              # upstream daily precipitation_sum
+        self.now_hour = None                # local hour of the last fetch
+        self.utc_offset = 0                 # seconds, from the last response
+        self.synced_at = 0.0                # time of the last full fetch
+
+    def merge(self, first: int, precipitation: list, soil: list):
+        """Write hours first.. over the buffer, sliding the window forward and evicting what falls out."""
+        n = len(precipitation)
+        if not n:
+            return
+        capacity = len(self.precipitation)
+        last = first + n - 1
+        if self.first is None:
+            self.first, self.last = first, first - 1
+
+        window_last = max(self.last, last)
+        window_first = max(min(self.first, first), window_last - capacity + 1)
+        if window_first > self.first:
+            self._evict(self.first, min(window_first, self.last + 1), window_first)
+
+        skip = max(0, window_first - first)
+        hours = np.arange(first + skip, last + 1)
+        slots = hours % capacity
+        rain = as_float32(precipitation[skip:], n - skip)
+        self._add_rain(hours, _zeroed(rain) - _zeroed(self.precipitation[slots]))
+        self.precipitation[slots] = rain
+        self.soil[slots] = as_float32(soil[skip:], n - skip)
+        self.first, self.last = window_first, window_last
+
+    def _evict(self, start: int, stop: int, window_first: int):
+        if stop > start:
+            slots = np.arange(start, stop) % len(self.precipitation)
+            self._add_rain(np.arange(start, stop), -_zeroed(self.precipitation[slots]))
+            self.precipitation[slots] = np.nan
+            self.soil[slots] = np.nan
+        # Days now wholly outside the window read as zero, so their slots can be reused
+        gone = np.arange(start // 24, min(window_first // 24, start // 24 + WINDOW_DAYS))
+        self.day_rain[gone % WINDOW_DAYS] = 0.0
+
+    def _add_rain(self, hours: np.ndarray, delta: np.ndarray):
+        first_day = int(hours[0]) // 24
+        totals = np.bincount(hours // 24 - first_day, weights=delta)
+        self.day_rain[np.arange(first_day, first_day + len(totals)) % WINDOW_DAYS] += totals
+
+    def rain_totals(self, today: int) -> tuple:
+        """(rain over the previous local day, rain over the previous 7 days), `today` as a day number."""
+        if self.first is None:
+            return 0.0, 0.0
+        days = np.arange(today - 7, today)
+        buffered = (days >= self.first // 24) & (days <= self.last // 24)
+        week = np.where(buffered, self.day_rain[days % WINDOW_DAYS], 0.0)
+        return float(week[-1]), float(week.sum())
+
+    def horizon(self, now_hour: int) -> tuple:
+        """rolling_horizon() over the buffered hours."""
+        if self.first is None:
+            return now_hour, np.empty((3, 0), dtype=np.float32)
+        slots = np.arange(self.first, self.last + 1) % len(self.precipitation)
+        return rolling_horizon(self.first, self.precipitation[slots], self.soil[slots], now_hour)
+
+    def last_soil_moisture(self):
+        """Latest non-missing soil moisture in the window (forecast hours included), or None."""
+        if self.first is None:
+            return None
+        capacity = len(self.soil)
+        for hour in range(self.last, self.first - 1, -1):  # usually the very last hour
+            value = self.soil[hour % capacity]
+            if value == value:
+                return float(value)
+        return None
+
+
+class DailySeries:
+    """Daily values for one cell (river discharge), keyed by day number; NaN marks a missing day."""
+
+    __slots__ = ("days", "today", "synced_at")
+
+    def __init__(self):
+        self.days = DayRing()
+        self.today = None        # the upstream's "today" (day number) at the last fetch
+        self.synced_at = 0.0
+
+
+class SeriesStore:
+    """Bounded LRU of per-cell series. An evicted cell simply gets a full fetch next time."""
+
+    def __init__(self, factory, max_size: int):
+        self.factory = factory
+        self.max_size = max_size
+        self._series = OrderedDict()
+
+    def get(self, key):
+        series = self._series.get(key)
+        if series is not None:
+            self._series.move_to_end(key)
+        return series
+
+    def reset(self, key):
+        """Start a fresh series for `key` (on a full fetch), dropping whatever was buffered."""
+        series = self._series[key] = self.factory()
+        self._series.move_to_end(key)
+        while len(self._series) > self.max_size:
+            self._series.popitem(last=False)
+        return series
+
+    def __len__(self) -> int:
+        return len(self._series)
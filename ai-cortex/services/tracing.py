@@ -0,0 +1,154 @@
+"""
+Request Tracing — per-request stage spans kept in a contextvar, returned as a
+Server-Timing header and logged as one JSON line per request. Optionally runs
+cProfile on a sample of requests (or on request via X-Profile) and saves the
+profiles of slow ones to disk for offline analysis (snakeviz, pstats).
+"""
+import asyncio
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from services.metrics import is_event_stream
+
+logger = logging.getLogger(__name__)
+
+# Log requests taking at least this long (0 logs every request, e.g. when debugging locally)
+REQUEST_LOG_MIN_MS = float(os.getenv("REQUEST_LOG_MIN_MS", "500"))
+# Fraction of requests to profile; only those slower than PROFILE_SLOW_MS are saved
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+# Honour "X-Profile: 1" from clients (the profile is always saved); keep off on public deployments
+PROFILE_HEADER_ENABLED = os.getenv("PROFILE_HEADER_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "floodsense-profiles"))
+
+_spans = contextvars.ContextVar("request_spans", default=None)
+# cProfile hooks the whole thread, so only one request is profiled at a time
+_profiling = False
+
+
+@contextmanager
+def span(name: str):
+    """Time a stage of the current request. A no-op outside a request."""
+    spans = _spans.get()
+    if spans is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append((name, (time.perf_counter() - started) * 1000))
+
+
+async def timed(name: str, awaitable):
+    """Await `awaitable` inside a span — for stages run concurrently with asyncio.gather."""
+    with span(name):
+        return await awaitable
+
+
+def server_timing(spans: list, total_ms: float) -> str:
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in [*spans, ("total", total_ms)])
+
+
+def _profile_requested(scope) -> bool:
+    if PROFILE_HEADER_ENABLED:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return value.strip() in (b"1", b"true")
+    return False
+
+
+def _stop_profiling(profiler: cProfile.Profile):
+    global _profiling
+    profiler.disable()
+    _profiling = False
+
+
+def _save_profile(profiler: cProfile.Profile, route: str, duration_ms: float) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", route).strip("_") or "root"
+    path = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{slug}-{duration_ms:.0f}ms.prof")
+    profiler.dump_stats(path)
+    return path
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware: opens the span list for the request, adds Server-Timing
+    to the response and logs the request. Profiles cover everything the event-loop
+    thread did during the request, including other requests interleaved with it.
+    Event streams are neither profiled nor logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _profiling
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        spans = []
+        token = _spans.set(spans)
+        started = time.perf_counter()
+        status = [500]
+        streaming = [False]
+
+        forced = _profile_requested(scope)
+        profiler = None
+        if not _profiling and (forced or (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE)):
+            _profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        async def send_with_timing(message):
+            nonlocal profiler
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if is_event_stream(message.get("headers", [])):
+                    streaming[0] = True
+                    if profiler is not None:
+                        _stop_profiling(profiler)
+                        profiler = None
+                total_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(spans, total_ms).encode()))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            _spans.reset(token)
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+
+            profile_path = None
+            if profiler is not None:
+                _stop_profiling(profiler)
+                if forced or duration_ms >= PROFILE_SLOW_MS:
+                    profile_path = await asyncio.to_thread(_save_profile, profiler, route, duration_ms)
+
+            if not streaming[0] and (duration_ms >= REQUEST_LOG_MIN_MS or profile_path):
+                stages = {}
+                for name, ms in spans:
+                    stages[name] = stages.get(name, 0.0) + ms
+                logger.info(json.dumps({
+                    "event": "request",
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status[0],
+                    "duration_ms": round(duration_ms, 2),
+                    "spans": {name: round(ms, 2) for name, ms in stages.items()},
+                    **({"profile": profile_path} if profile_path else {}),
+                }))
@@ -2,103 +2,340 @@
 Weather Service — fetches real-time rainfall, soil moisture, temperature
 from Open-Meteo API (free, no API key needed).
 """
-import httpx
-from datetime import datetime
+import asyncio
+import math
+import os
+import time
 
-OPEN_METEO_BASE = "https://api.open-meteo.com/v1"
+import numpy as np
+
+from services.batcher import BatchFetcher
+from services.cache import TTLCache, grid_key
+from services.disk_cache import DiskCache
+from services.http_client import get_json
+from services.singleflight import SingleFlight
+from services.snapshots import DischargeSnapshot, WeatherSnapshot
+from services.timeseries import (
+    DailySeries, HourlySeries, SeriesStore, as_float32, day_number, hour_index, rolling_horizon,
+)
+
+# Override to point at a local stand-in (benchmarks/openmeteo_standin.py) for offline load tests
+OPEN_METEO_BASE = os.getenv("OPEN_METEO_BASE", "https://api.open-meteo.com/v1").rstrip("/")
+FLOOD_API_BASE = os.getenv("FLOOD_API_BASE", "https://flood-api.open-meteo.com/v1").rstrip("/")
+
+# Grid resolution (degrees) of the upstream models — points in one cell share a cache entry
+WEATHER_GRID_RESOLUTION = float(os.getenv("WEATHER_GRID_RESOLUTION", "0.1"))
+FLOOD_GRID_RESOLUTION = float(os.getenv("FLOOD_GRID_RESOLUTION", "0.05"))
+
+# Concurrent single-point fetches arriving within BATCH_WINDOW are sent as one multi-location call
+BATCH_WINDOW = float(os.getenv("BATCH_WINDOW_MS", "5")) / 1000
+BATCH_MAX_LOCATIONS = int(os.getenv("BATCH_MAX_LOCATIONS", "50"))
+
+# Persistent second-level cache shared by all workers on the host (survives restarts)
+DISK_CACHE_ENABLED = os.getenv("DISK_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+DISK_CACHE_PATH = os.getenv(
+    "DISK_CACHE_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "cache", "openmeteo.sqlite3"),
+)
+_disk_cache = DiskCache(DISK_CACHE_PATH) if DISK_CACHE_ENABLED else None
+
+_weather_cache = TTLCache(
+    "weather",
+    max_size=int(os.getenv("WEATHER_CACHE_SIZE", "10000")),
+    cadence=float(os.getenv("WEATHER_MODEL_CADENCE", "3600")),   # forecast updates hourly
+    publish_lag=float(os.getenv("WEATHER_PUBLISH_LAG", "300")),
+    stale_ttl=float(os.getenv("WEATHER_STALE_TTL", "21600")),
+    store=_disk_cache,
+    record_type=WeatherSnapshot,
+)
+_discharge_cache = TTLCache(
+    "discharge",
+    max_size=int(os.getenv("DISCHARGE_CACHE_SIZE", "10000")),
+    cadence=float(os.getenv("DISCHARGE_MODEL_CADENCE", "86400")),  # GloFAS runs daily
+    publish_lag=float(os.getenv("DISCHARGE_PUBLISH_LAG", "3600")),
+    stale_ttl=float(os.getenv("DISCHARGE_STALE_TTL", "86400")),
+    store=_disk_cache,
+    record_type=DischargeSnapshot,
+)
+
+# Rolling per-cell series: a refresh asks only for the hours (days) since the cell's last fetch
+INCREMENTAL_FETCH_ENABLED = os.getenv("INCREMENTAL_FETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+# Recent past hours fetched again on every refresh, to pick up upstream revisions
+SERIES_OVERLAP_HOURS = int(os.getenv("SERIES_OVERLAP_HOURS", "3"))
+
+PAST_DAYS, FORECAST_DAYS = 7, 3
+# A full refetch at least this often bounds drift from revisions to older hours. Capped at the forecast
+# length: incremental fetches carry no past days of daily totals, so a longer gap would leave holes
+SERIES_RESYNC_HOURS = min(float(os.getenv("SERIES_RESYNC_HOURS", "24")), FORECAST_DAYS * 24)
+# Incremental past_hours are rounded up to this step so one batch rarely needs more than one request
+PAST_HOURS_STEP = 6
+FULL_WINDOW = (("past_days", PAST_DAYS), ("forecast_days", FORECAST_DAYS))
+
+_weather_series = SeriesStore(HourlySeries, _weather_cache.max_size)
+_discharge_series = SeriesStore(DailySeries, _discharge_cache.max_size)
+_series_fetches = {"weather": {"full": 0, "incremental": 0, "values": 0},
+                   "discharge": {"full": 0, "incremental": 0, "values": 0}}
+
+_flights = SingleFlight()
 
 
 async def get_current_weather(lat: float, lon: float) -> dict:
-    """Fetch current weather + hourly forecast for a location."""
+    """Fetch current weather + hourly forecast for a location (cached per grid cell)."""
+    return (await get_weather_snapshot(lat, lon)).as_dict(lat, lon)
+
+
+async def get_river_discharge(lat: float, lon: float) -> dict:
+    """Fetch river discharge data from Open-Meteo Flood API (cached per grid cell)."""
+    return (await get_discharge_snapshot(lat, lon)).as_dict(lat, lon)
+
+
+async def get_weather_snapshot(lat: float, lon: float, fresh: bool = False) -> WeatherSnapshot:
+    """fresh=True waits for the latest model run instead of serving an expired entry (see TTLCache)."""
+    key = grid_key(lat, lon, WEATHER_GRID_RESOLUTION)
+    return await _weather_cache.get_or_fetch(key, lambda: _load_weather(key), fresh)
+
+
+async def get_discharge_snapshot(lat: float, lon: float, fresh: bool = False) -> DischargeSnapshot:
+    """Never raises: a failed flood API call yields an "unavailable" snapshot."""
+    key = grid_key(lat, lon, FLOOD_GRID_RESOLUTION)
+    try:
+        return await _discharge_cache.get_or_fetch(key, lambda: _load_discharge(key), fresh)
+    except Exception as e:
+        return DischargeSnapshot.unavailable(str(e))
+
+
+async def get_location_data(lat: float, lon: float, timeout: float, fresh: bool = False) -> tuple:
+    """Fetch (WeatherSnapshot, DischargeSnapshot) for one location concurrently, within `timeout` seconds."""
+    try:
+        return await asyncio.wait_for(
+            asyncio.gather(get_weather_snapshot(lat, lon, fresh), get_discharge_snapshot(lat, lon, fresh)),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Timed out after {timeout:g}s")
+
+
+def cache_stats() -> dict:
+    return {
+        "weather": _weather_cache.stats(),
+        "discharge": _discharge_cache.stats(),
+        "singleflight": _flights.stats(),
+        "disk": _disk_cache.stats() if _disk_cache is not None else None,
+        "series": {
+            "enabled": INCREMENTAL_FETCH_ENABLED,
+            "weather": {"locations": len(_weather_series), **_series_fetches["weather"]},
+            "discharge": {"locations": len(_discharge_series), **_series_fetches["discharge"]},
+        },
+    }
+
+
+def close_disk_cache():
+    if _disk_cache is not None:
+        _disk_cache.close()
+
+
+def batch_stats() -> dict:
+    return {"weather": _weather_batcher.stats(), "discharge": _discharge_batcher.stats()}
+
+
+def _as_locations(data) -> list:
+    """Open-Meteo returns an object for one location and a list for several."""
+    return data if isinstance(data, list) else [data]
+
+
+async def _fetch_by_window(points: list, window_for, fetch_window) -> list:
+    """Split a batch by request window (full vs. the recent hours each cell is missing), one call per window."""
+    groups = {}
+    for point in points:
+        groups.setdefault(window_for(point), []).append(point)
+    parts = await asyncio.gather(*(fetch_window(group, window) for window, group in groups.items()))
+    results = {}
+    for group, records in zip(groups.values(), parts):
+        results.update(zip(group, records))
+    return [results[point] for point in points]
+
+
+async def _load_weather(key: tuple) -> WeatherSnapshot:
+    return await _flights.do(("weather", key), lambda: _fetch_current_weather(*key))
+
+
+async def _load_discharge(key: tuple) -> DischargeSnapshot:
+    return await _flights.do(("discharge", key), lambda: _fetch_river_discharge(*key))
+
+
+async def _fetch_current_weather(lat: float, lon: float) -> WeatherSnapshot:
+    return await _weather_batcher.fetch(lat, lon)
+
+
+async def _fetch_river_discharge(lat: float, lon: float) -> DischargeSnapshot:
+    return await _discharge_batcher.fetch(lat, lon)
+
+
+async def _fetch_weather_many(points: list) -> list:
+    return await _fetch_by_window(points, _weather_window, _fetch_weather_window)
+
+
+def _weather_window(key: tuple) -> tuple:
+    """Request window for a cell: the full 7+3 days, or the hours since its last fetch through day+2."""
+    series = _weather_series.get(key) if INCREMENTAL_FETCH_ENABLED else None
+    now = time.time()
+    if series is None or now - series.synced_at >= SERIES_RESYNC_HOURS * 3600:
+        return FULL_WINDOW
+    hour = int(now + series.utc_offset) // 3600
+    missed = hour - series.now_hour + SERIES_OVERLAP_HOURS
+    past_hours = math.ceil(missed / PAST_HOURS_STEP) * PAST_HOURS_STEP
+    forecast_hours = (hour // 24 + FORECAST_DAYS) * 24 - hour
+    # forecast_days still sizes the daily block, which has no past days on an incremental fetch
+    return ("past_hours", past_hours), ("forecast_hours", forecast_hours), ("forecast_days", FORECAST_DAYS)
+
+
+async def _fetch_weather_window(points: list, window: tuple) -> list:
     url = f"{OPEN_METEO_BASE}/forecast"
     params = {
-        "latitude": lat,
-        "longitude": lon,
+        "latitude": ",".join(str(lat) for lat, _ in points),
+        "longitude": ",".join(str(lon) for _, lon in points),
         "current": "temperature_2m,relative_humidity_2m,precipitation,rain,weather_code,wind_speed_10m",
-        "hourly": "precipitation,soil_moisture_0_to_1cm,temperature_2m",
+        "hourly": "precipitation,soil_moisture_0_to_1cm",
         "daily": "precipitation_sum,rain_sum",
         "timezone": "Asia/Kolkata",
-        "forecast_days": 3,
-        "past_days": 7,
+        **dict(window),
     }
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        data = resp.json()
+    data = await get_json(url, params)
+    if not INCREMENTAL_FETCH_ENABLED:
+        return [_parse_weather(item) for item in _as_locations(data)]
+    full = window == FULL_WINDOW
+    return [_merge_weather(point, item, full) for item, point in zip(_as_locations(data), points)]
+
 
+_weather_batcher = BatchFetcher("weather", _fetch_weather_many, BATCH_WINDOW, BATCH_MAX_LOCATIONS)
+
+
+def _parse_weather(data: dict) -> WeatherSnapshot:
     current = data.get("current", {})
     hourly = data.get("hourly", {})
     daily = data.get("daily", {})
 
-    precip_hourly = hourly.get("precipitation", [])
+    precip_hourly = np.array(hourly.get("precipitation", []), dtype=np.float64)  # None -> NaN
     soil_moisture_hourly = hourly.get("soil_moisture_0_to_1cm", [])
 
     # Past 24h rainfall (7 past days * 24 = 168 past hours, + 3 forecast days * 24 = 72)
-    total_hours = len(precip_hourly)
-    now_idx = total_hours - 72  # end of past data
-    past_24h = precip_hourly[max(0, now_idx - 24):now_idx] if now_idx > 0 else []
-    rainfall_24h = sum(p for p in past_24h if p is not None)
+    now_idx = len(precip_hourly) - 72  # end of past data
+    past_7d = precip_hourly[max(0, now_idx - 168):max(0, now_idx)]
+    past_7d = np.where(np.isnan(past_7d), 0.0, past_7d)
+    rainfall_24h = past_7d[-24:].sum()
+    rainfall_7d = past_7d.sum()
 
-    past_7d = precip_hourly[max(0, now_idx - 168):now_idx] if now_idx > 0 else []
-    rainfall_7d = sum(p for p in past_7d if p is not None)
+    soil_moisture = next((s for s in reversed(soil_moisture_hourly) if s is not None), 0.0)
 
-    valid_sm = [s for s in soil_moisture_hourly if s is not None]
-    soil_moisture = valid_sm[-1] if valid_sm else 0.0
+    times = hourly.get("time", [])
+    horizon = None
+    if times and "time" in current:
+        horizon = rolling_horizon(hour_index(times[0]), precip_hourly,
+                                  as_float32(soil_moisture_hourly, len(precip_hourly)), hour_index(current["time"]))
 
-    return {
-        "lat": lat,
-        "lon": lon,
-        "temperature": current.get("temperature_2m", 0),
-        "humidity": current.get("relative_humidity_2m", 0),
-        "current_precipitation": current.get("precipitation", 0),
-        "current_rain": current.get("rain", 0),
-        "wind_speed": current.get("wind_speed_10m", 0),
-        "weather_code": current.get("weather_code", 0),
-        "rainfall_24h": round(rainfall_24h, 1),
-        "rainfall_7d": round(rainfall_7d, 1),
-        "soil_moisture": round(soil_moisture, 4),
-        "daily_precipitation": daily.get("precipitation_sum", []),
-        "daily_dates": daily.get("time", []),
-        "source": "Open-Meteo",
-        "timestamp": datetime.now().isoformat(),
-    }
+    dates = daily.get("time", [])
+    return WeatherSnapshot.build(current, float(rainfall_24h), float(rainfall_7d), float(soil_moisture),
+                                 as_float32(daily.get("precipitation_sum", []), len(dates)),
+                                 day_number(dates[0]) if dates else 0, horizon)
 
 
-async def get_river_discharge(lat: float, lon: float) -> dict:
-    """Fetch river discharge data from Open-Meteo Flood API."""
-    url = "https://flood-api.open-meteo.com/v1/flood"
+def _merge_weather(key: tuple, data: dict, full: bool) -> WeatherSnapshot:
+    """Merge one location's response into the cell's series and build the snapshot from the series."""
+    current = data.get("current", {})
+    hourly = data.get("hourly", {})
+    daily = data.get("daily", {})
+    if "time" not in current:  # nothing to anchor the windows on
+        return _parse_weather(data)
+    series = _weather_series.reset(key) if full else _weather_series.get(key)
+    if series is None:  # evicted from the store mid-flight; this response alone is the full picture
+        series = _weather_series.reset(key)
+
+    now_hour = hour_index(current["time"])
+    today = now_hour // 24
+    oldest, newest = today - PAST_DAYS, today + FORECAST_DAYS - 1
+    end = (newest + 1) * 24  # the window ends with day+2, as on a full fetch
+    times = hourly.get("time", [])
+    if times:
+        first = hour_index(times[0])
+        keep = max(0, min(len(times), end - first))
+        series.merge(first, hourly.get("precipitation", [])[:keep], hourly.get("soil_moisture_0_to_1cm", [])[:keep])
+    dates = daily.get("time", [])
+    if dates:
+        series.daily.merge(day_number(dates[0]), daily.get("precipitation_sum", []), oldest)
+
+    series.now_hour = now_hour
+    series.utc_offset = data.get("utc_offset_seconds", series.utc_offset)
+    if full:
+        series.synced_at = time.time()
+    stats = _series_fetches["weather"]
+    stats["full" if full else "incremental"] += 1
+    stats["values"] += len(times)
+
+    rainfall_24h, rainfall_7d = series.rain_totals(today)
+    soil_moisture = series.last_soil_moisture()
+    first_day, daily_precipitation = series.daily.window(oldest, newest)
+    return WeatherSnapshot.build(current, rainfall_24h, rainfall_7d, 0.0 if soil_moisture is None else soil_moisture,
+                                 daily_precipitation, first_day, series.horizon(now_hour))
+
+
+async def _fetch_discharge_many(points: list) -> list:
+    return await _fetch_by_window(points, _discharge_window, _fetch_discharge_window)
+
+
+def _discharge_window(key: tuple) -> tuple:
+    """Request window for a cell: the full 7+3 days, or the days since its last fetch plus one."""
+    series = _discharge_series.get(key) if INCREMENTAL_FETCH_ENABLED else None
+    now = time.time()
+    if series is None or now - series.synced_at >= SERIES_RESYNC_HOURS * 3600:
+        return FULL_WINDOW
+    missed = int(now // 86400) - series.today  # the flood API's days are UTC
+    if missed + 1 >= PAST_DAYS:
+        return FULL_WINDOW
+    return ("past_days", missed + 1), ("forecast_days", FORECAST_DAYS)
+
+
+async def _fetch_discharge_window(points: list, window: tuple) -> list:
+    url = f"{FLOOD_API_BASE}/flood"
     params = {
-        "latitude": lat,
-        "longitude": lon,
+        "latitude": ",".join(str(lat) for lat, _ in points),
+        "longitude": ",".join(str(lon) for _, lon in points),
         "daily": "river_discharge",
-        "past_days": 7,
-        "forecast_days": 3,
+        **dict(window),
     }
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-
-        daily = data.get("daily", {})
-        discharges = daily.get("river_discharge", [])
-        dates = daily.get("time", [])
-        valid = [d for d in discharges if d is not None]
-
-        return {
-            "lat": lat,
-            "lon": lon,
-            "current_discharge": valid[-1] if valid else 0.0,
-            "max_discharge_7d": max(valid) if valid else 0.0,
-            "avg_discharge_7d": round(sum(valid) / len(valid), 2) if valid else 0.0,
-            "discharge_trend": discharges,
-            "dates": dates,
-            "source": "Open-Meteo Flood API",
-        }
-    except Exception as e:
-        return {
-            "lat": lat, "lon": lon,
-            "current_discharge": 0.0, "max_discharge_7d": 0.0,
-            "avg_discharge_7d": 0.0, "discharge_trend": [], "dates": [],
-            "source": "unavailable", "error": str(e),
-        }
+    data = await get_json(url, params)
+    if not INCREMENTAL_FETCH_ENABLED:
+        return [_parse_discharge(item) for item in _as_locations(data)]
+    past_days = dict(window)["past_days"]
+    return [_merge_discharge(point, item, past_days, window == FULL_WINDOW)
+            for item, point in zip(_as_locations(data), points)]
+
+
+_discharge_batcher = BatchFetcher("discharge", _fetch_discharge_many, BATCH_WINDOW, BATCH_MAX_LOCATIONS)
+
+
+def _parse_discharge(data: dict) -> DischargeSnapshot:
+    daily = data.get("daily", {})
+    dates = daily.get("time", [])
+    discharges = np.array(daily.get("river_discharge", []), dtype=np.float64)  # None -> NaN
+    return DischargeSnapshot.build(discharges, day_number(dates[0]) if dates else 0)
+
+
+def _merge_discharge(key: tuple, data: dict, past_days: int, full: bool) -> DischargeSnapshot:
+    daily = data.get("daily", {})
+    dates = daily.get("time", [])
+    if len(dates) <= past_days:  # no forecast days in the response; nothing to anchor "today" on
+        return _parse_discharge(data)
+    series = _discharge_series.reset(key) if full else _discharge_series.get(key)
+    if series is None:
+        series = _discharge_series.reset(key)
+
+    series.today = day_number(dates[past_days])
+    oldest, newest = series.today - PAST_DAYS, series.today + FORECAST_DAYS - 1
+    series.days.merge(day_number(dates[0]), daily.get("river_discharge", []), oldest)
+    if full:
+        series.synced_at = time.time()
+    stats = _series_fetches["discharge"]
+    stats["full" if full else "incremental"] += 1
+    stats["values"] += len(dates)
+
+    first_day, discharges = series.days.window(oldest, newest)
+    return DischargeSnapshot.build(discharges, first_day)
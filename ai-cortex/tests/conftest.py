@@ -0,0 +1,57 @@
+"""
+Shared fixtures. Run from ai-cortex/: python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ml import model  # noqa: E402
+
+
+def random_features(n: int, seed: int = 7) -> np.ndarray:
+    """Plausible N×10 feature rows, a share of them sitting exactly on the rule thresholds."""
+    rng = np.random.default_rng(seed)
+    features = np.column_stack([
+        rng.exponential(60, n),          # rainfall_24h
+        rng.exponential(250, n),         # rainfall_7d
+        rng.uniform(0, 1, n),            # soil_moisture
+        rng.exponential(1500, n),        # river_discharge
+        rng.exponential(2000, n),        # max_discharge_7d
+        rng.exponential(1000, n),        # avg_discharge_7d
+        rng.uniform(30, 98, n),          # humidity
+        rng.uniform(15, 42, n),          # temperature
+        rng.uniform(0, 40, n),           # wind_speed
+        rng.choice([0, 3, 61, 63, 65, 95], n).astype(float),
+    ])
+    edges = {}
+    for index, thresholds, _ in model.RISK_RULES:
+        edges.setdefault(index, set()).update(thresholds)
+    for index, threshold, *_ in model.FACTOR_RULES:
+        edges.setdefault(index, set()).add(threshold)
+    for index, values in edges.items():
+        on_edge = rng.random(n) < 0.2
+        features[on_edge, index] = rng.choice(sorted(values), on_edge.sum())
+    return features
+
+
+@pytest.fixture
+def features() -> np.ndarray:
+    return random_features(2000)
+
+
+@pytest.fixture
+def rule_based(monkeypatch):
+    """No trained model: predictions come from the rules."""
+    monkeypatch.setattr(model, "_active", (None, None))
+
+
+@pytest.fixture
+def bundled_model(monkeypatch):
+    """The bundled NumPy export as the active model."""
+    ensemble = model.TreeEnsemble.load(model.TREES_PATH)
+    monkeypatch.setattr(model, "_active", ("bundled", ensemble))
+    return ensemble
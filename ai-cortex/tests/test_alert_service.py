@@ -0,0 +1,109 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from services import alert_service
+from services.alert_service import VECTORIZE_MIN_BATCH, WEATHER_CODES, interpret_weather_risk, interpret_weather_risk_batch
+
+NOW = datetime(2026, 10, 17, 9, 30, 1, 123)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch):
+    monkeypatch.setattr(alert_service, "datetime", FrozenDatetime)
+
+
+def reference_alerts(weather: dict) -> list:
+    """The per-location if-chain interpret_weather_risk ran before the rules table."""
+    rainfall_24h = weather.get("rainfall_24h", 0)
+    rainfall_7d = weather.get("rainfall_7d", 0)
+    soil_moisture = weather.get("soil_moisture", 0)
+    weather_code = weather.get("weather_code", 0)
+
+    def alert(prefix, alert_type, severity, title, message, recommendation, source="FloodSense AI Analysis"):
+        return {
+            "id": f"{prefix}-{NOW.strftime('%Y%m%d%H')}", "type": alert_type, "severity": severity,
+            "title": title, "message": message, "recommendation": recommendation,
+            "lat": weather.get("lat", 0), "lon": weather.get("lon", 0),
+            "source": source, "timestamp": NOW.isoformat(),
+        }
+
+    alerts = []
+    if rainfall_24h > 100:
+        alerts.append(alert("RAIN", "EXTREME_RAINFALL", "SEVERE", "Extreme Rainfall Warning",
+                            f"Extremely heavy rainfall of {rainfall_24h}mm recorded in past 24 hours. Flash flood risk is very high.",
+                            "Evacuate low-lying areas immediately. Move to higher ground."))
+    elif rainfall_24h > 50:
+        alerts.append(alert("RAIN", "HEAVY_RAINFALL", "HIGH", "Heavy Rainfall Alert",
+                            f"Heavy rainfall of {rainfall_24h}mm in past 24 hours. Flood risk elevated.",
+                            "Avoid waterlogged areas. Keep emergency supplies ready."))
+    elif rainfall_24h > 20:
+        alerts.append(alert("RAIN", "MODERATE_RAINFALL", "MODERATE", "Rainfall Advisory",
+                            f"Moderate rainfall of {rainfall_24h}mm in past 24 hours.",
+                            "Stay alert. Monitor local water levels."))
+    if soil_moisture > 0.8:
+        alerts.append(alert("SOIL", "SOIL_SATURATION", "HIGH", "Soil Saturation Warning",
+                            f"Soil moisture at {soil_moisture*100:.0f}%. Ground cannot absorb more water — high runoff expected.",
+                            "Risk of landslides in hilly areas. Avoid slopes."))
+    if rainfall_7d > 300:
+        alerts.append(alert("CUM", "CUMULATIVE_RAINFALL", "SEVERE", "Prolonged Flooding Risk",
+                            f"Total {rainfall_7d}mm rainfall over 7 days. Rivers and reservoirs likely at capacity.",
+                            "Be prepared for sustained flooding. Follow NDMA guidelines."))
+    if weather_code >= 95:
+        alerts.append(alert("STORM", "THUNDERSTORM", "HIGH", "Severe Thunderstorm",
+                            f"Active thunderstorm detected. {WEATHER_CODES.get(weather_code, 'Severe weather')}.",
+                            "Stay indoors. Avoid open areas and water bodies.", "Open-Meteo Weather"))
+    if not alerts:
+        alerts.append(alert("OK", "ALL_CLEAR", "LOW", "No Active Warnings",
+                            f"Current conditions normal. Rainfall: {rainfall_24h}mm/24h. Weather: {WEATHER_CODES.get(weather_code, 'Unknown')}.",
+                            "No action needed. Continue to monitor."))
+    return alerts
+
+
+def random_weathers(n: int, seed: int = 0) -> list:
+    """Weather records with values drawn on and around every rule threshold, some fields missing."""
+    rnd = random.Random(seed)
+    weathers = []
+    for i in range(n):
+        weather = {
+            "lat": round(rnd.uniform(8, 30), 2), "lon": round(rnd.uniform(70, 95), 2),
+            "rainfall_24h": rnd.choice([0, 20, 20.0, 20.1, 50, 50.1, 100, 100.1, round(rnd.uniform(0, 200), 1)]),
+            "rainfall_7d": rnd.choice([300, 300.0, 300.1, round(rnd.uniform(0, 600), 1)]),
+            "soil_moisture": rnd.choice([0.8, 0.8001, 0.005, 0.855, round(rnd.uniform(0, 1), 4)]),
+            "weather_code": rnd.choice([0, 3, 63, 94, 95, 96, 97, 99, 100]),
+        }
+        if i % 7 == 0:
+            del weather[rnd.choice(["rainfall_7d", "soil_moisture", "lat"])]
+        weathers.append(weather)
+    return weathers
+
+
+@pytest.mark.parametrize("n", [1, 5, VECTORIZE_MIN_BATCH - 1, VECTORIZE_MIN_BATCH, 500])
+def test_batch_matches_reference(n):
+    weathers = random_weathers(n, seed=n)
+    expected = [reference_alerts(weather) for weather in weathers]
+    assert interpret_weather_risk_batch(weathers, now=NOW) == expected
+    assert [interpret_weather_risk(weather) for weather in weathers] == expected
+
+
+def test_locations_override_records():
+    weathers = random_weathers(VECTORIZE_MIN_BATCH)
+    locations = [(float(i), -float(i)) for i in range(len(weathers))]
+    for i, alerts in enumerate(interpret_weather_risk_batch(weathers, locations, now=NOW)):
+        assert all((alert["lat"], alert["lon"]) == locations[i] for alert in alerts)
+
+
+@pytest.mark.parametrize("n", [5, 500])
+def test_missing_values_never_fire(n):
+    # None (a gap upstream) must behave the same on both paths: that rule stays quiet
+    weathers = [dict(weather, rainfall_7d=None, soil_moisture=None) for weather in random_weathers(n)]
+    batch = interpret_weather_risk_batch(weathers, now=NOW)
+    assert batch == [interpret_weather_risk(weather) for weather in weathers]
+    assert not any(alert["type"] in ("SOIL_SATURATION", "CUMULATIVE_RAINFALL") for alerts in batch for alert in alerts)
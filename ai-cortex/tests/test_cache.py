@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from services import cache
+from services.cache import TTLCache
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(10 * 3600 + 60)
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+
+def make_cache() -> TTLCache:
+    return TTLCache("test", max_size=10, cadence=3600, publish_lag=0, stale_ttl=6 * 3600)
+
+
+def fetcher(*values):
+    values = list(values)
+
+    async def fetch():
+        value = values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return fetch
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(clock):
+    async def run():
+        c = make_cache()
+        fetch = fetcher("run 1", "run 2")
+        assert await c.get_or_fetch("k", fetch) == "run 1"
+        clock.now += 3600  # next model run
+        assert await c.get_or_fetch("k", fetch) == "run 1"
+        await asyncio.gather(*c._refreshing.values())
+        assert await c.get_or_fetch("k", fetch) == "run 2"
+    asyncio.run(run())
+
+
+def test_fresh_waits_for_the_new_run(clock):
+    async def run():
+        c = make_cache()
+        fetch = fetcher("run 1", "run 2", "run 3")
+        assert await c.get_or_fetch("k", fetch, fresh=True) == "run 1"
+        assert await c.get_or_fetch("k", fetch, fresh=True) == "run 1"  # still fresh: no fetch
+        clock.now += 3600
+        assert await c.get_or_fetch("k", fetch, fresh=True) == "run 2"
+        clock.now += 3600
+        assert await c.get_or_fetch("k", fetch, fresh=True) == "run 3"
+        assert not c._refreshing
+    asyncio.run(run())
+
+
+def test_fresh_falls_back_to_stale_on_failure(clock):
+    async def run():
+        c = make_cache()
+        fetch = fetcher("run 1", RuntimeError("upstream down"))
+        await c.get_or_fetch("k", fetch)
+        clock.now += 3600
+        assert await c.get_or_fetch("k", fetch, fresh=True) == "run 1"
+    asyncio.run(run())
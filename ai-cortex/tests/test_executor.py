@@ -0,0 +1,34 @@
+import asyncio
+import threading
+
+from ml import executor
+
+
+def test_cancelled_jobs_leave_the_queue(monkeypatch):
+    monkeypatch.setattr(executor, "INFERENCE_WORKERS", 1)
+    release = threading.Event()
+
+    async def run():
+        blocker = asyncio.ensure_future(executor.run_inference(release.wait, 5))
+        queued = [asyncio.ensure_future(executor.run_inference(sum, [1, 2])) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert executor.executor_stats()["queue_depth"] == 3
+        executor.shutdown()  # drops the queued jobs
+        release.set()
+        results = await asyncio.gather(blocker, *queued, return_exceptions=True)
+        assert results[0] is True
+        assert all(isinstance(r, asyncio.CancelledError) for r in results[1:])
+        assert executor.executor_stats()["queue_depth"] == 0
+        assert executor.executor_stats()["running"] == 0
+
+    asyncio.run(run())
+
+
+def test_completed_jobs_are_counted_once():
+    async def run():
+        before = executor.executor_stats()["completed"]
+        assert await asyncio.gather(*(executor.run_inference(sum, [i, 1]) for i in range(5))) == [1, 2, 3, 4, 5]
+        stats = executor.executor_stats()
+        assert stats["completed"] == before + 5 and stats["queue_depth"] == 0
+    asyncio.run(run())
+    executor.shutdown()
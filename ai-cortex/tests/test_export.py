@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+from ml import train  # noqa: E402
+from ml.model import TreeEnsemble  # noqa: E402
+from ml.train import EXPORT_TOLERANCE, export_trees, generate_training_data, verify_export  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return generate_training_data(3000, seed=3)
+
+
+@pytest.fixture(scope="module")
+def booster(dataset):
+    X, y = dataset
+    return xgb.train({"max_depth": 5, "eta": 0.3, "objective": "reg:squarederror"}, xgb.DMatrix(X, y),
+                     num_boost_round=30)
+
+
+def test_export_reproduces_xgboost(booster, dataset, tmp_path):
+    X, _ = dataset
+    path = str(tmp_path / "model.npz")
+    export_trees(booster, path, X[:500])
+    X = np.array(X[:1000], dtype=np.float32)
+    X[::5, 0] = np.nan  # missing values take each split's default branch
+    X[::3, 2] = np.nan
+    error = np.abs(TreeEnsemble.load(path).predict(X) - booster.inplace_predict(X))
+    assert error.max() <= EXPORT_TOLERANCE
+
+
+def test_verify_export_rejects_a_mismatch(booster, dataset, tmp_path):
+    X, _ = dataset
+    path = str(tmp_path / "model.npz")
+    arrays = export_trees(booster, path, X[:500])
+    np.savez_compressed(path, **{**arrays, "base_score": arrays["base_score"] + np.float32(0.01)})
+    with pytest.raises(ValueError, match="differ from XGBoost"):
+        verify_export(booster, path, X[:500])
+
+
+def test_bundled_export_matches_bundled_model(dataset):
+    joblib = pytest.importorskip("joblib")
+    X, _ = dataset
+    assert verify_export(joblib.load(train.MODEL_PATH), train.TREES_PATH, X) <= EXPORT_TOLERANCE
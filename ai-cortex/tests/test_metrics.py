@@ -0,0 +1,33 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from services import metrics
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/plain")
+    def plain():
+        return {"ok": True}
+
+    @app.get("/events")
+    def events():
+        async def body():
+            yield b"event: snapshot\ndata: {}\n\n"
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    return app
+
+
+def test_event_streams_stay_out_of_the_latency_histogram():
+    client = TestClient(make_app())
+    client.get("/plain")
+    client.get("/events")
+    text = metrics.render()
+    latency = [line for line in text.splitlines() if line.startswith("floodsense_http_request_duration_seconds")]
+    assert 'floodsense_http_request_duration_seconds_count{route="/plain",method="GET"} 1' in latency
+    assert not [line for line in latency if 'route="/events"' in line]
+    assert 'floodsense_http_requests_total{route="/events",method="GET",status="200"} 1' in text.splitlines()
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from ml import model
+from ml.model import FEATURE_NAMES, predict_risk, predict_risk_batch, predict_risk_features
+
+
+def reference_risk(row: np.ndarray) -> dict:
+    """The per-row prediction predict_risk_batch replaced: one model call and an if-chain per location."""
+    version, active = model._active
+    if active is not None:
+        probability = min(1.0, max(0.0, float(active.predict(row[None].astype(np.float32))[0])))
+    else:
+        probability = model._rule_based_risk(row)
+
+    if probability >= 0.75:
+        risk_level = "SEVERE"
+        recommendation = "Immediate evacuation recommended. Contact NDRF helpline 1078."
+    elif probability >= 0.5:
+        risk_level = "HIGH"
+        recommendation = "Prepare for possible flooding. Move valuables to higher ground."
+    elif probability >= 0.25:
+        risk_level = "MODERATE"
+        recommendation = "Stay alert. Monitor weather updates and river levels."
+    else:
+        risk_level = "LOW"
+        recommendation = "No immediate flood risk. Continue routine monitoring."
+
+    return {
+        "risk_level": risk_level,
+        "probability": round(probability, 3),
+        "risk_score": round(probability * 10, 1),
+        "contributing_factors": model._get_contributing_factors(row),
+        "recommendation": recommendation,
+        "model": f"trained@{version}" if active is not None else "rule-based",
+        "features_used": dict(zip(FEATURE_NAMES, row.tolist())),
+    }
+
+
+def as_records(features: np.ndarray) -> tuple:
+    weathers, discharges = [], []
+    for row in features.tolist():
+        weathers.append({
+            "rainfall_24h": row[0], "rainfall_7d": row[1], "soil_moisture": row[2], "humidity": row[6],
+            "temperature": row[7], "wind_speed": row[8], "weather_code": row[9],
+        })
+        discharges.append({"current_discharge": row[3], "max_discharge_7d": row[4], "avg_discharge_7d": row[5]})
+    return weathers, discharges
+
+
+@pytest.mark.parametrize("active", ["rule_based", "bundled_model"])
+def test_batch_matches_per_row_reference(active, features, request):
+    request.getfixturevalue(active)
+    expected = [reference_risk(row) for row in features]
+    assert predict_risk_features(features) == expected
+    assert predict_risk_batch(*as_records(features)) == expected
+
+
+def test_classification_boundaries(rule_based):
+    # Rule scores of 0, 0.2, 0.25 (exactly on the MODERATE threshold), 0.3, 0.6 and 0.85
+    for rain, rain_7d, soil, level in [(0, 0, 0, "LOW"), (25, 0, 0.6, "LOW"), (25, 250, 0, "MODERATE"),
+                                       (60, 0, 0.6, "MODERATE"), (250, 0, 0.9, "HIGH"), (250, 250, 0.9, "SEVERE")]:
+        row = np.array([[rain, rain_7d, soil, 0, 0, 0, 50, 25, 0, 0]], dtype=np.float64)
+        assert predict_risk_features(row)[0]["risk_level"] == level
+        assert predict_risk_features(row) == [reference_risk(row[0])]
+
+
+def test_single_location_wrapper(bundled_model, features):
+    weathers, discharges = as_records(features[:5])
+    assert [predict_risk(w, d) for w, d in zip(weathers, discharges)] == predict_risk_batch(weathers, discharges)
+
+
+def test_empty_batch():
+    assert predict_risk_features(np.empty((0, len(FEATURE_NAMES)))) == []
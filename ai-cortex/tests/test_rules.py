@@ -0,0 +1,27 @@
+import numpy as np
+
+from ml.model import _contributing_factors_batch, _get_contributing_factors, _rule_based_risk, _rule_based_risk_batch
+
+
+def with_missing(features: np.ndarray) -> np.ndarray:
+    features = features.copy()
+    features[::11, 0] = np.nan
+    features[::13, 2] = np.nan
+    return features
+
+
+def test_rule_based_risk_matches_scalar(features):
+    for rows in (features, with_missing(features), features[:1]):
+        assert np.array_equal(_rule_based_risk_batch(rows), np.array([_rule_based_risk(row) for row in rows]))
+
+
+def test_contributing_factors_match_scalar(features):
+    for rows in (features, with_missing(features), features[:1]):
+        assert _contributing_factors_batch(rows) == [_get_contributing_factors(row) for row in rows]
+
+
+def test_factor_lists_are_independent(features):
+    # Rows with no factor each get their own copy of the placeholder
+    quiet = np.zeros((2, features.shape[1]))
+    first, second = _contributing_factors_batch(quiet)
+    assert first == second and first[0] is not second[0]
@@ -0,0 +1,45 @@
+import numpy as np
+
+from ml.model import predict_risk_features, predict_risk_horizon
+from services.snapshots import DischargeSnapshot, WeatherSnapshot, feature_matrix, horizon_features
+from services.timeseries import day_number
+
+
+def make_snapshots(hours: int = 30) -> tuple:
+    today = day_number("2026-10-17")
+    now_hour = today * 24 + 5
+    horizon = np.array([
+        np.linspace(14.3, 40.0, hours),   # rolling 24h rain: differs from the calendar-day total below
+        np.linspace(90.0, 160.0, hours),
+        np.full(hours, 0.41),
+    ], dtype=np.float32)
+    weather = WeatherSnapshot.build(
+        {"temperature_2m": 27.5, "relative_humidity_2m": 88, "precipitation": 1.2, "rain": 1.2,
+         "wind_speed_10m": 12.0, "weather_code": 61},
+        rainfall_24h=12.0, rainfall_7d=85.0, soil_moisture=0.4,
+        daily_precipitation=np.full(10, 5.0, dtype=np.float32), first_day=today - 7,
+        horizon=(now_hour, horizon),
+    )
+    discharge = DischargeSnapshot.build(np.linspace(300, 1500, 10), today - 7)
+    return weather, discharge
+
+
+def test_horizon_starts_at_the_predict_features(rule_based):
+    weather, discharge = make_snapshots()
+    times, features = horizon_features(weather, discharge)
+    now = feature_matrix([weather], [discharge])
+    assert times[0] == "2026-10-17T05:00" and len(times) == len(features) == 30
+    assert np.array_equal(features[0], now[0])
+    assert features[1, 0] != now[0, 0]  # later hours use the rolling windows
+
+    timeline, _, _ = predict_risk_horizon(features)
+    expected = predict_risk_features(now)[0]
+    assert timeline[0] == {name: expected[name] for name in ("risk_level", "risk_score", "probability")}
+
+
+def test_horizon_without_discharge(rule_based):
+    weather, _ = make_snapshots(5)
+    times, features = horizon_features(weather, DischargeSnapshot.unavailable("down"))
+    assert len(times) == 5
+    assert np.array_equal(features[0], feature_matrix([weather], [DischargeSnapshot.unavailable("down")])[0])
+    assert not features[1:, 3:6].any()
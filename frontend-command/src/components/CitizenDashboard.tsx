@@ -252,7 +252,7 @@ export default function CitizenDashboard({ onLogout, userState, userDistrict }:
                     <div className="flex items-end gap-1 h-24">{(liveRisk?.weather?.daily_precipitation || [12, 8, 25, 40, 62, 35, 18, 9, 15, 22]).slice(-10).map((v, i) => { const max = Math.max(...(liveRisk?.weather?.daily_precipitation || [62]).slice(-10)); return <div key={i} className="flex-1 flex flex-col items-center justify-end gap-0.5"><span className="text-[8px] text-gray-400">{typeof v === 'number' ? v.toFixed(0) : v}</span><div className={`w-full rounded-t ${Number(v) > 40 ? "bg-red-500" : Number(v) > 20 ? "bg-yellow-500" : "bg-blue-400"}`} style={{ height: `${Math.max(4, (Number(v) / Math.max(max, 1)) * 80)}px` }} /></div> })}</div>
                 </div>
                 <div className="bg-white border border-gray-200 rounded-lg p-4"><h3 className="text-xs font-bold text-gray-500 uppercase mb-2">🤖 Forecasting Model</h3>
-                    <div className="space-y-2 text-xs text-gray-600"><p><strong>{t(language, "model")}:</strong> {liveRisk?.model === "trained" ? "XGBoost ML" : "AI Analysis (Heuristic)"}</p><p><strong>{t(language, "sources")}:</strong> Open-Meteo, GloFAS, IMD</p><p><strong>{t(language, "accuracy")}:</strong> ~85% (1hr), ~72% (6hr)</p></div>
+                    <div className="space-y-2 text-xs text-gray-600"><p><strong>{t(language, "model")}:</strong> {liveRisk?.model?.startsWith("trained") ? "XGBoost ML" : "AI Analysis (Heuristic)"}</p><p><strong>{t(language, "sources")}:</strong> Open-Meteo, GloFAS, IMD</p><p><strong>{t(language, "accuracy")}:</strong> ~85% (1hr), ~72% (6hr)</p></div>
                 </div>
                 <div className="bg-white border border-gray-200 rounded-lg p-4"><h3 className="text-xs font-bold text-gray-500 uppercase mb-2">🏗️ {t(language, "infrastructure")} — {userDistrict.name}</h3>
                     <div className="grid grid-cols-2 gap-2 text-xs"><div className={`p-2 rounded border ${userDistrict.drainageHealth === "BLOCKED" || userDistrict.drainageHealth === "POOR" ? "bg-red-50 border-red-200" : "bg-green-50 border-green-200"}`}><p className="text-gray-500">{t(language, "drainage")}</p><p className="font-bold">{userDistrict.drainageHealth || "N/A"}</p></div><div className={`p-2 rounded border ${userDistrict.embankmentRisk === "HIGH" ? "bg-red-50 border-red-200" : "bg-green-50 border-green-200"}`}><p className="text-gray-500">{t(language, "embankment")}</p><p className="font-bold">{userDistrict.embankmentRisk || "N/A"}</p></div></div>
@@ -113,7 +113,7 @@ export default function MapDashboard({ onLogout }: { onLogout?: () => void }) {
                             <div style="background:#f9fafb;border:1px solid #e5e7eb;border-radius:4px;padding:5px;text-align:center;"><div style="color:#9ca3af;font-size:9px;">SOIL</div><div style="color:#1f2937;font-weight:bold;font-size:12px;">${((data.weather?.soil_moisture || 0) * 100).toFixed(0)}%</div></div>
                             <div style="background:#f9fafb;border:1px solid #e5e7eb;border-radius:4px;padding:5px;text-align:center;"><div style="color:#9ca3af;font-size:9px;">DISCHARGE</div><div style="color:#1f2937;font-weight:bold;font-size:12px;">${data.discharge?.current_discharge?.toFixed(1) || 0} m³/s</div></div>
                         </div>
-                        <div style="color:#9ca3af;font-size:9px;margin-top:5px;text-align:right;">📡 ${data.model === 'trained' ? 'ML Model' : 'AI Analysis'} · ${data.weather?.source || 'Open-Meteo'}</div>
+                        <div style="color:#9ca3af;font-size:9px;margin-top:5px;text-align:right;">📡 ${data.model?.startsWith('trained') ? 'ML Model' : 'AI Analysis'} · ${data.weather?.source || 'Open-Meteo'}</div>
                     </div>
                 `);
                 setAlerts(prev => [`[${new Date().toLocaleTimeString()}] ${lat.toFixed(2)},${lng.toFixed(2)} → ${data.riskLevel} (${data.riskScore})`, ...prev.slice(0, 49)]);